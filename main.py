@@ -5,13 +5,19 @@ import sys
 import logging
 from datetime import datetime
 
+import yaml
+
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.collector import NewsCollector
 from src.newsletter import NewsletterGenerator
 from src.publisher import ManualPublisher, EmailPublisher, SubstackPublisher
-from src.database import ArticleDatabase
+from src.sharding import open_database, store_path
+from src.dedup import NearDuplicateDetector
+from src.filters import ContentFilter
+from src.rescore import KeywordRescorer
+from src.scoring import build_scorer
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,14 +26,38 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def load_config(config_path: str = 'config/sources.yaml') -> dict:
+    try:
+        with open(config_path, 'r') as f:
+            return yaml.safe_load(f) or {}
+    except Exception as e:
+        logger.error(f"Error loading config: {e}")
+        return {}
+
+
+def load_database(config_path: str = 'config/sources.yaml'):
+    """Open the article store configured in the ``database`` section."""
+    return open_database(load_config(config_path).get('database'))
+
+
+def load_deduplicator(config: dict, db) -> NearDuplicateDetector:
+    """Duplicate index kept in the article store ``db``."""
+    dedup_config = config.get('deduplication') or {}
+    return NearDuplicateDetector(
+        db_path=store_path(db),
+        threshold=dedup_config.get('threshold', 0.6),
+        window_days=dedup_config.get('window_days', 14)
+    )
+
+
 def collect():
     """Run the news collector."""
     logger.info("=" * 60)
     logger.info("Starting: Collect news")
     logger.info("=" * 60)
     
-    collector = NewsCollector()
-    result = collector.run_collection(save_raw=True)
+    with NewsCollector() as collector:
+        result = collector.run_collection(save_raw=True)
     
     print(f"\n✅ Collection complete!")
     print(f"   Total articles: {result['total_collected']}")
@@ -43,21 +73,35 @@ def generate(publish: bool = False):
     logger.info("Starting: Generate newsletter")
     logger.info("=" * 60)
     
-    db = ArticleDatabase()
+    config = load_config()
+    settings = config.get('newsletter') or {}
+    items_per_section = settings.get('items_per_section', 5)
     generator = NewsletterGenerator()
     
-    # Get recent articles
-    articles = db.get_articles(limit=30)
+    with open_database(config.get('database')) as db:
+        # Best unsent articles of each section from the recent window
+        articles = db.get_ranked_articles(
+            per_section=items_per_section,
+            window_days=settings.get('window_days', 7),
+            decay_days=settings.get('decay_days', 3)
+        )
+        
+        # Copies of each story from other sources become related links
+        load_deduplicator(config, db).attach_duplicates(articles)
+        
+        # Get issue number
+        issue_number = db.get_collection_count()
     
     if not articles:
         logger.error("No articles found. Run 'collect' first.")
         return None
     
-    # Get issue number
-    issue_number = db.get_collection_count()
-    
     # Generate newsletter
-    post = generator.generate_substack_post(articles, issue_number=issue_number)
+    post = generator.generate_substack_post(
+        articles,
+        issue_number=issue_number,
+        max_items_per_section=items_per_section
+    )
     
     # Save outputs
     manual = ManualPublisher()
@@ -144,8 +188,10 @@ def publish_newsletter(post: dict, files: dict) -> bool:
 
 def stats():
     """Show database stats."""
-    db = ArticleDatabase()
-    stats = db.get_stats()
+    with load_database() as db:
+        stats = db.get_stats()
+        history = db.get_source_history(runs=1)
+        top_keywords = db.get_top_keywords(limit=10)
     
     print("\n📊 Database Statistics")
     print("=" * 40)
@@ -162,6 +208,59 @@ def stats():
         print("\nBy Relevance:")
         for level, count in stats['by_relevance'].items():
             print(f"  {level}: {count}")
+    
+    if history:
+        print(f"\nLast Run ({history[0]['run_at']}):")
+        for row in history:
+            print(f"  {row['source']}: {row['relevant']}/{row['collected']} relevant")
+    
+    if top_keywords:
+        print("\nTop Keywords:")
+        for keyword, count in top_keywords.items():
+            print(f"  {keyword}: {count}")
+
+
+def search(query: str, limit: int = 20):
+    """Full-text search across collected articles."""
+    with load_database() as db:
+        results = db.search(query, limit=limit)
+    
+    print(f"\n🔎 {len(results)} results for: {query}")
+    print("=" * 40)
+    for article in results:
+        print(f"\n[{article['source']}] {article['title']}")
+        print(f"  {article['collected_at']} | score {article['filter_score']}")
+        if article['url']:
+            print(f"  {article['url']}")
+        if article['snippet']:
+            print(f"  {article['snippet']}")
+    
+    return results
+
+
+def cleanup(days: int = 30):
+    """Archive and delete old, already-sent articles."""
+    config = load_config()
+    with open_database(config.get('database')) as db:
+        deleted = db.cleanup_old_articles(days=days)
+        load_deduplicator(config, db).prune()
+    
+    print(f"\n🧹 Archived and removed {deleted} articles older than {days} days")
+    return deleted
+
+
+def rescore(full: bool = False, workers: int = 1):
+    """Re-score stored articles after parent_keywords changes."""
+    config = load_config()
+    content_filter = ContentFilter(config.get('parent_keywords', {}))
+    with open_database(config.get('database')) as db:
+        rescorer = KeywordRescorer(db, content_filter, workers=workers, scorer=build_scorer(config))
+        result = rescorer.run(full=full)
+    
+    print(f"\n🔁 Re-scored {result['updated']} of {result['candidates']} candidate articles")
+    print(f"   Keywords added: {result['added']}, removed/changed: {result['changed']}")
+    print(f"   No longer relevant: {result['dropped']}, unchanged: {result['unchanged']}")
+    return result
 
 
 def main():
@@ -173,9 +272,37 @@ def main():
     )
     parser.add_argument(
         'command',
-        choices=['collect', 'generate', 'publish', 'full', 'stats'],
+        choices=['collect', 'generate', 'publish', 'full', 'stats', 'search', 'cleanup', 'rescore'],
         help='Command to run'
     )
+    parser.add_argument(
+        'query',
+        nargs='*',
+        help='Search terms (for search command)'
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=20,
+        help='Maximum number of search results'
+    )
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=30,
+        help='Retention window in days (for cleanup command)'
+    )
+    parser.add_argument(
+        '--full-rescore',
+        action='store_true',
+        help='Re-score every stored article (for rescore command)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Filter worker processes (for rescore command)'
+    )
     parser.add_argument(
         '--publish',
         action='store_true',
@@ -206,6 +333,17 @@ def main():
     
     elif args.command == 'stats':
         stats()
+    
+    elif args.command == 'search':
+        if not args.query:
+            parser.error('search requires query terms')
+        search(' '.join(args.query), limit=args.limit)
+    
+    elif args.command == 'cleanup':
+        cleanup(days=args.days)
+    
+    elif args.command == 'rescore':
+        rescore(full=args.full_rescore, workers=args.workers)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,193 @@
+"""Query-plan regression checks for the hot ArticleDatabase queries.
+
+Builds (or reuses, if its row count and indexes are current) a large
+synthetic database and runs EXPLAIN QUERY PLAN on every query shape used
+by ``main.py generate`` and the collector. Any plan that scans the
+articles table without an index or sorts through a temp B-tree is
+reported, and the script exits non-zero so the check can run in CI:
+
+    python scripts/check_query_plans.py --rows 1000000
+"""
+import os
+import sys
+import sqlite3
+import random
+import logging
+import argparse
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Tuple
+
+# Run from a checkout: make the project root importable.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import ArticleDatabase
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SOURCES = [
+    'Cleveland.com Local News',
+    'WKYC News 5 Cleveland',
+    'Fox 8 Cleveland',
+    'Axios Cleveland',
+    'Cleveland Scene',
+]
+
+RELEVANCE_LEVELS = ['high', 'medium', 'low']
+
+# (name, get_articles keyword arguments)
+HOT_ARTICLE_QUERIES: List[Tuple[str, Dict[str, Any]]] = [
+    ('newsletter_top', {'limit': 30}),
+    ('newsletter_content', {'limit': 20}),
+    ('by_relevance', {'limit': 30, 'relevance_level': 'high'}),
+    ('by_source', {'limit': 30, 'source': 'Fox 8 Cleveland'}),
+    ('by_section', {'limit': 10, 'section': 'events'}),
+    ('recent_window', {'limit': 30, 'since': '2026-01-01'}),
+    ('relevance_recent', {'limit': 30, 'relevance_level': 'high', 'since': '2026-01-01'}),
+    ('iter_page', {'limit': 1000, 'after': (10.0, '2026-01-01T00:00:00', 'synthetic-1')}),
+    ('iter_relevance_page', {
+        'limit': 1000,
+        'relevance_level': 'medium',
+        'after': (10.0, '2026-01-01T00:00:00', 'synthetic-1')
+    }),
+]
+
+# (name, _build_ranked_query keyword arguments). The window function has to
+# sort its candidates by a computed score, so only full scans are reported;
+# the date window keeps that sort small.
+HOT_RANKED_QUERIES: List[Tuple[str, Dict[str, Any]]] = [
+    ('newsletter_sections', {
+        'per_section': 5,
+        'since': '2026-01-01T00:00:00',
+        'now': '2026-01-08T00:00:00',
+        'decay_days': 3.0
+    }),
+]
+
+# (name, SQL, params)
+HOT_RAW_QUERIES: List[Tuple[str, str, List[Any]]] = [
+    ('last_collection', 'SELECT collected_at FROM articles ORDER BY collected_at DESC LIMIT 1', []),
+    ('article_counts', 'SELECT dimension, value, count FROM article_counts WHERE count > 0', []),
+]
+
+
+def plan_problems(plan: List[str], allow_sort: bool = False) -> List[str]:
+    problems = []
+    for detail in plan:
+        if detail.startswith('SCAN articles') and 'INDEX' not in detail:
+            problems.append(f"full table scan: {detail}")
+        if 'USE TEMP B-TREE' in detail and not allow_sort:
+            problems.append(f"temp sort: {detail}")
+    return problems
+
+
+def check_query_plans(db: ArticleDatabase) -> Dict[str, List[str]]:
+    """Return ``{query name: [problems]}`` for every hot query with a bad plan."""
+    failures: Dict[str, List[str]] = {}
+
+    queries = [
+        (name, *db._build_articles_query(**kwargs))
+        for name, kwargs in HOT_ARTICLE_QUERIES
+    ]
+    queries.extend(HOT_RAW_QUERIES)
+    queries.extend(
+        (name, *db._build_ranked_query(**kwargs))
+        for name, kwargs in HOT_RANKED_QUERIES
+    )
+    ranked_names = {name for name, _ in HOT_RANKED_QUERIES}
+
+    for name, query, params in queries:
+        plan = db.explain_query_plan(query, params)
+        problems = plan_problems(plan, allow_sort=name in ranked_names)
+        logger.info(f"{name}: {' | '.join(plan)}")
+        if problems:
+            failures[name] = problems
+
+    return failures
+
+
+def index_schema(conn: sqlite3.Connection) -> Dict[str, str]:
+    """Index definitions by name, with whitespace normalized."""
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+    ).fetchall()
+    return {name: ' '.join(sql.split()) for name, sql in rows}
+
+
+def build_synthetic_database(db_path: str, rows: int, batch_size: int = 10000) -> ArticleDatabase:
+    db = ArticleDatabase(db_path)
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+
+    for offset in range(0, rows, batch_size):
+        batch = []
+        for i in range(offset, min(rows, offset + batch_size)):
+            collected = start + timedelta(minutes=rng.randrange(0, 2 * 365 * 24 * 60))
+            batch.append({
+                'id': f'synthetic-{i}',
+                'title': f'Synthetic article {i}',
+                'url': f'https://example.com/{i}',
+                'description': 'Synthetic article for query plan checks',
+                'source': rng.choice(SOURCES),
+                'category': 'local_news',
+                'published_at': collected.isoformat(),
+                'collected_at': collected.isoformat(),
+                'type': 'rss',
+                'filter_score': round(rng.uniform(0, 20), 1),
+                'filter_category': 'education_family',
+                'relevance_level': rng.choice(RELEVANCE_LEVELS),
+                'matched_keywords': ['school']
+            })
+        db.bulk_insert_articles(batch, batch_size=batch_size)
+
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check query plans of hot ArticleDatabase queries')
+    parser.add_argument('--db', default='data/query_plans.db', help='Synthetic database path')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Rows to generate')
+    parser.add_argument('--rebuild', action='store_true', help='Regenerate the database')
+    args = parser.parse_args()
+
+    db = None
+    if os.path.exists(args.db) and not args.rebuild:
+        # Read the indexes before ArticleDatabase migrates them, so a
+        # database built by an older schema is regenerated, not patched.
+        conn = sqlite3.connect(args.db)
+        try:
+            existing_indexes = index_schema(conn)
+        finally:
+            conn.close()
+        with ArticleDatabase(':memory:') as fresh, fresh.get_connection() as conn:
+            expected_indexes = index_schema(conn)
+        if existing_indexes != expected_indexes:
+            logger.info(f"Index schema of {args.db} is out of date; regenerating")
+        else:
+            db = ArticleDatabase(args.db)
+            if db.get_stats()['total_articles'] < args.rows:
+                db.close()
+                db = None
+
+    if db is None:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+        logger.info(f"Generating {args.rows} synthetic articles in {args.db}")
+        db = build_synthetic_database(args.db, args.rows)
+
+    failures = check_query_plans(db)
+    db.close()
+
+    if failures:
+        print("\nQuery plan regressions:")
+        for name, problems in failures.items():
+            for problem in problems:
+                print(f"  {name}: {problem}")
+        sys.exit(1)
+
+    print("\nAll hot queries use indexes without temp sorts.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Group related stories with TF-IDF cosine similarity.
+
+The whole candidate set is turned into one sparse TF-IDF matrix (kept as
+coordinate arrays) and pairwise similarities are accumulated term by term
+from the posting lists, so only pairs that share a term are ever touched
+and no Python loop runs over article pairs. Pairs above the threshold are
+joined into clusters with vectorized label propagation.
+"""
+import re
+import logging
+from typing import List, Dict, Any
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]{2,}')
+
+
+def _score(article: Dict[str, Any]) -> float:
+    score = article.get('decayed_score')
+    if score is None:
+        score = article.get('filter_score')
+    return score or 0
+
+
+class StoryClusterer:
+    """Cluster articles about the same story or event.
+
+    Terms in more than ``max_df`` of the candidates (and more than
+    ``min_postings`` articles, so small issues are not pruned) are ignored
+    when pairing: they carry little signal and would create the most pairs.
+    They still count towards each article's vector norm.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.4,
+        max_df: float = 0.1,
+        min_postings: int = 50
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_df = max_df
+        self.min_postings = min_postings
+
+    def _text(self, article: Dict[str, Any]) -> str:
+        return f"{article.get('title') or ''} {article.get('description') or ''}".lower()
+
+    def cluster_labels(self, articles: List[Dict[str, Any]]):
+        """Cluster label per article; articles sharing a label are related."""
+        n = len(articles)
+        if n < 2:
+            return list(range(n))
+
+        vocabulary: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        for i, article in enumerate(articles):
+            for token in TOKEN_PATTERN.findall(self._text(article)):
+                rows.append(i)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+        if not rows:
+            return list(range(n))
+
+        # Term counts: collapse repeated (article, term) entries.
+        keys, tf = np.unique(
+            np.array(rows, dtype=np.int64) * len(vocabulary) + np.array(cols, dtype=np.int64),
+            return_counts=True
+        )
+        row = keys // len(vocabulary)
+        col = keys % len(vocabulary)
+
+        df = np.bincount(col, minlength=len(vocabulary))
+        idf = np.log((1 + n) / (1 + df)) + 1.0
+        weight = (1 + np.log(tf)) * idf[col]
+        norms = np.sqrt(np.bincount(row, weights=weight * weight, minlength=n))
+        weight = weight / norms[row]
+
+        # Only terms shared by at least two (and not too many) articles pair them up.
+        max_postings = max(self.min_postings, int(self.max_df * n))
+        useful = (df[col] >= 2) & (df[col] <= max_postings)
+        row, col, weight = row[useful], col[useful], weight[useful]
+        if len(row) == 0:
+            return list(range(n))
+
+        order = np.lexsort((row, col))
+        row, col, weight = row[order], col[order], weight[order]
+
+        # For each posting, pair it with the later postings of the same term.
+        group_end = np.searchsorted(col, col, side='right')
+        pair_counts = group_end - np.arange(len(col)) - 1
+        total = int(pair_counts.sum())
+        if total == 0:
+            return list(range(n))
+        left = np.repeat(np.arange(len(col)), pair_counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+        right = left + 1 + offsets
+
+        pair_keys = row[left] * n + row[right]
+        pairs, inverse = np.unique(pair_keys, return_inverse=True)
+        similarity = np.bincount(inverse, weights=weight[left] * weight[right])
+
+        linked = pairs[similarity >= self.similarity_threshold]
+        a, b = linked // n, linked % n
+
+        labels = np.arange(n)
+        while len(linked):
+            low = np.minimum(labels[a], labels[b])
+            updated = labels.copy()
+            np.minimum.at(updated, a, low)
+            np.minimum.at(updated, b, low)
+            updated = updated[updated]
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+        return labels.tolist()
+
+    def cluster(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Collapse each cluster into its highest-scoring article.
+
+        Articles ranked by ``get_ranked_articles`` are compared by their
+        recency-decayed score, so a stale story does not lead a fresh one.
+
+        The lead article gets a ``related`` list with the other articles of
+        its cluster, newest first. Clusters keep the order in which their
+        first article appears in ``articles``.
+        """
+        labels = self.cluster_labels(articles)
+        groups: Dict[int, List[Dict[str, Any]]] = {}
+        for label, article in zip(labels, articles):
+            groups.setdefault(label, []).append(article)
+
+        leads = []
+        for members in groups.values():
+            top = max(members, key=_score)
+            lead = dict(top)
+            lead['related'] = sorted(
+                (a for a in members if a is not top),
+                key=lambda a: a.get('published_at') or a.get('collected_at') or '',
+                reverse=True
+            )
+            leads.append(lead)
+
+        merged = len(articles) - len(leads)
+        if merged:
+            logger.info(f"Grouped {merged} related stories into {len(leads)} entries")
+        return leads
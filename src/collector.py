@@ -2,14 +2,19 @@ import json
 import logging
 import os
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 import yaml
 
 from .rss_feeds import RSSFeedParser
 from .scrapers import WebScraper
 from .browser_scraper import BrowserScraper
 from .filters import ContentFilter
-from .database import ArticleDatabase
+from .sharding import open_database, store_path
+from .writer import DatabaseWriter
+from .fetch_cache import FetchCache
+from .filter_cache import FilterCache
+from .dedup import NearDuplicateDetector
+from .scoring import build_scorer
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,10 +32,35 @@ class NewsCollector:
         rate_delay = rate_config.get('default_delay', 1.0)
         timeout = rate_config.get('timeout', 30)
         
-        self.rss_parser = RSSFeedParser(rate_limit_delay=rate_delay, timeout=timeout)
-        self.web_scraper = WebScraper(rate_limit_delay=rate_delay, timeout=timeout)
-        self.content_filter = ContentFilter(self.config.get('parent_keywords', {}))
-        self.database = ArticleDatabase()
+        self.fetch_cache = FetchCache()
+        self.rss_parser = RSSFeedParser(
+            rate_limit_delay=rate_delay,
+            timeout=timeout,
+            max_requests_per_minute=rate_config.get('max_requests_per_minute'),
+            max_workers=rate_config.get('max_concurrent_feeds', 5),
+            cache=self.fetch_cache
+        )
+        self.web_scraper = WebScraper(
+            rate_limit_delay=rate_delay,
+            timeout=timeout,
+            cache=self.fetch_cache
+        )
+        self.database = open_database(self.config.get('database'))
+        self.writer_queue_size = self.config.get('database', {}).get('writer_queue_size', 16)
+        
+        self.filter_cache = FilterCache(db_path=store_path(self.database))
+        self.content_filter = ContentFilter(
+            self.config.get('parent_keywords', {}),
+            cache=self.filter_cache
+        )
+        self.scorer = build_scorer(self.config)
+        
+        dedup_config = self.config.get('deduplication', {})
+        self.deduplicator = NearDuplicateDetector(
+            db_path=store_path(self.database),
+            threshold=dedup_config.get('threshold', 0.6),
+            window_days=dedup_config.get('window_days', 14)
+        )
         
         self.raw_dir = 'data/raw'
         self.processed_dir = 'data/processed'
@@ -38,6 +68,16 @@ class NewsCollector:
         os.makedirs(self.raw_dir, exist_ok=True)
         os.makedirs(self.processed_dir, exist_ok=True)
 
+    def close(self) -> None:
+        """Close the article store; sharded stores re-freeze old months."""
+        self.database.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
     def _load_config(self) -> Dict[str, Any]:
         try:
             with open(self.config_path, 'r') as f:
@@ -54,10 +94,13 @@ class NewsCollector:
         except Exception as e:
             logger.error(f"Error saving to {filepath}: {e}")
 
-    def collect_rss_feeds(self) -> List[Dict[str, Any]]:
+    def collect_rss_feeds(
+        self,
+        on_feed: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+    ) -> List[Dict[str, Any]]:
         logger.info("Starting RSS feed collection...")
         feeds = self.config.get('rss_feeds', [])
-        articles = self.rss_parser.parse_all_feeds(feeds)
+        articles = self.rss_parser.parse_all_feeds(feeds, on_feed=on_feed)
         logger.info(f"Collected {len(articles)} articles from RSS feeds")
         return articles
 
@@ -99,27 +142,79 @@ class NewsCollector:
         logger.info(f"Starting news collection run at {timestamp}")
         logger.info("=" * 50)
         
-        rss_articles = self.collect_rss_feeds()
-        scraped_items = self.collect_scraped_content()
+        # Each feed is filtered as soon as it arrives and its relevant
+        # articles are handed to the background writer, so database inserts
+        # overlap with the remaining fetching, scraping and filtering.
+        # Near-duplicates of an already stored story are recorded against it
+        # instead of being stored again.
+        relevant: List[Dict[str, Any]] = []
+        filtered_out: List[Dict[str, Any]] = []
+        duplicates: List[Dict[str, Any]] = []
+        
+        self.deduplicator.prune()
         
-        all_content = rss_articles + scraped_items
+        with DatabaseWriter(self.database, max_pending=self.writer_queue_size) as writer:
+            def process_batch(articles: List[Dict[str, Any]]) -> None:
+                batch_relevant, batch_filtered = self.content_filter.filter_articles(articles)
+                # Keep and relevance decisions are the keyword filter's; the
+                # scorer only re-ranks the articles it kept.
+                if self.scorer:
+                    self.scorer.apply(batch_relevant)
+                batch_relevant, batch_duplicates = self.deduplicator.partition(batch_relevant)
+                relevant.extend(batch_relevant)
+                duplicates.extend(batch_duplicates)
+                filtered_out.extend(batch_filtered)
+                writer.submit(batch_relevant)
+            
+            rss_articles = self.collect_rss_feeds(on_feed=process_batch)
+            scraped_items = self.collect_scraped_content()
+            process_batch(scraped_items)
+            
+            all_content = rss_articles + scraped_items
+            
+            if save_raw and all_content:
+                raw_file = os.path.join(self.raw_dir, f'raw_{timestamp}.json')
+                self._save_to_json(all_content, raw_file)
+            
+            relevant.sort(key=lambda x: x.get('filter_score', 0), reverse=True)
+            logger.info(f"Found {len(relevant)} relevant articles")
+            
+            if relevant:
+                processed_file = os.path.join(self.processed_dir, f'processed_{timestamp}.json')
+                self._save_to_json(relevant, processed_file)
+            
+            write_result = writer.close()
         
-        if save_raw and all_content:
-            raw_file = os.path.join(self.raw_dir, f'raw_{timestamp}.json')
-            self._save_to_json(all_content, raw_file)
+        for article_id, error in write_result.errors:
+            logger.error(f"Error inserting article {article_id}: {error}")
+        inserted = write_result.inserted
         
-        relevant, filtered_out = self.process_articles(all_content)
+        # Articles that were not stored must not stay canonical in the
+        # duplicate index, or later copies would point at nothing.
+        failed_ids = [article_id for article_id, _ in write_result.errors if article_id]
+        if failed_ids:
+            self.deduplicator.forget(failed_ids)
         
-        if relevant:
-            processed_file = os.path.join(self.processed_dir, f'processed_{timestamp}.json')
-            self._save_to_json(relevant, processed_file)
+        # Feed watermarks and HTTP validators are only recorded once the
+        # articles they cover are stored, so a failed run is retried in full.
+        if write_result.errors:
+            logger.warning("Some articles were not stored; feeds will be re-read next run")
+            self.fetch_cache.discard_pending()
+        else:
+            self.fetch_cache.commit_pending()
         
-        inserted = self.database.insert_articles(relevant)
+        by_source: Dict[str, Dict[str, int]] = {}
+        for article in all_content:
+            counts = by_source.setdefault(article.get('source') or 'Unknown', {'collected': 0, 'relevant': 0})
+            counts['collected'] += 1
+        for article in relevant:
+            by_source[article.get('source') or 'Unknown']['relevant'] += 1
         
         self.database.log_collection_run(
             rss_count=len(rss_articles),
             scraped_count=len(scraped_items),
-            filtered_count=len(relevant)
+            filtered_count=len(relevant),
+            by_source=by_source
         )
         
         filter_summary = self.content_filter.get_filter_summary(relevant)
@@ -131,6 +226,7 @@ class NewsCollector:
             'scraped_items': len(scraped_items),
             'relevant_articles': len(relevant),
             'filtered_out': len(filtered_out),
+            'duplicates': len(duplicates),
             'database_inserted': inserted,
             'filter_summary': filter_summary,
             'raw_file': f'{self.raw_dir}/raw_{timestamp}.json' if save_raw and all_content else None,
@@ -141,6 +237,7 @@ class NewsCollector:
         logger.info("Collection run complete!")
         logger.info(f"  Total collected: {result['total_collected']}")
         logger.info(f"  Relevant articles: {result['relevant_articles']}")
+        logger.info(f"  Near-duplicates: {result['duplicates']}")
         logger.info(f"  Database inserted: {result['database_inserted']}")
         logger.info("=" * 50)
         
@@ -164,8 +261,8 @@ class NewsCollector:
 
 
 def main():
-    collector = NewsCollector()
-    result = collector.run_collection()
+    with NewsCollector() as collector:
+        result = collector.run_collection()
     
     print(f"\nCollection Results:")
     print(f"  Timestamp: {result['timestamp']}")
@@ -1,27 +1,201 @@
 import sqlite3
 import logging
 import json
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import zlib
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Callable
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from contextlib import contextmanager
 
+from .sections import SectionClassifier
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _deflate_content(text: Optional[str]) -> Optional[bytes]:
+    if not text:
+        return None
+    return zlib.compress(text.encode('utf-8'), 6)
+
+
+def _inflate_content(body: Optional[bytes]) -> Optional[str]:
+    if body is None:
+        return None
+    return zlib.decompress(body).decode('utf-8')
+
+
+@dataclass
+class BulkInsertResult:
+    inserted: int = 0
+    unchanged: int = 0
+    errors: List[Tuple[Optional[str], str]] = field(default_factory=list)
+
+
+class ArticleRecord(Mapping):
+    """Read-only view of an article row that decodes JSON columns lazily.
+
+    Behaves like the dicts returned by ``get_articles`` but only pays for
+    ``json.loads`` when a JSON column is actually read. When a
+    ``content_loader`` is given, ``content`` is fetched from the compressed
+    side table on first access.
+    """
+
+    JSON_COLUMNS = frozenset({'matched_keywords'})
+
+    __slots__ = ('_row', '_decoded', '_content_loader')
+
+    def __init__(
+        self,
+        row: sqlite3.Row,
+        content_loader: Optional[Callable[[str], Optional[str]]] = None
+    ):
+        self._row = row
+        self._decoded: Dict[str, Any] = {}
+        self._content_loader = content_loader
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'content' and self._content_loader:
+            if key not in self._decoded:
+                self._decoded[key] = self._content_loader(self._row['id'])
+            return self._decoded[key]
+        if key in self.JSON_COLUMNS:
+            if key not in self._decoded:
+                self._decoded[key] = json.loads(self._row[key] or '[]')
+            return self._decoded[key]
+        try:
+            return self._row[key]
+        except IndexError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        return iter(self._row.keys())
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in self}
+
+
 class ArticleDatabase:
-    def __init__(self, db_path: str = 'data/newsletter.db'):
+    # Upsert keyed on id: rows whose content_hash is unchanged are left
+    # untouched, changed rows only rewrite their mutable columns, and
+    # collected_at, created_at and is_sent are always preserved.
+    INSERT_ARTICLE_SQL = '''
+        INSERT INTO articles (
+            id, title, url, description, content, source,
+            category, priority, published_at, collected_at,
+            article_type, filter_score, filter_category,
+            relevance_level, matched_keywords, section, content_hash, is_processed
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+        ON CONFLICT(id) DO UPDATE SET
+            title = excluded.title,
+            url = excluded.url,
+            description = excluded.description,
+            content = excluded.content,
+            source = excluded.source,
+            category = excluded.category,
+            priority = excluded.priority,
+            published_at = excluded.published_at,
+            article_type = excluded.article_type,
+            filter_score = excluded.filter_score,
+            filter_category = excluded.filter_category,
+            relevance_level = excluded.relevance_level,
+            matched_keywords = excluded.matched_keywords,
+            section = excluded.section,
+            content_hash = excluded.content_hash,
+            is_processed = 1
+        WHERE articles.content_hash IS NOT excluded.content_hash
+    '''
+
+    HASHED_FIELDS = (
+        'title', 'url', 'description', 'content', 'source', 'category',
+        'priority', 'type', 'filter_score', 'filter_category',
+        'relevance_level', 'matched_keywords', 'keyword_priorities', 'section'
+    )
+
+    def __init__(
+        self,
+        db_path: str = 'data/newsletter.db',
+        cache_size_kb: int = 16384,
+        mmap_size: int = 256 * 1024 * 1024,
+        busy_timeout_ms: int = 5000,
+        wal: bool = True
+    ):
         self.db_path = db_path
+        self.wal = wal
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self.section_classifier = SectionClassifier()
         self._init_database()
 
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=256,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        conn.create_function('inflate_content', 1, _inflate_content, deterministic=True)
+        # Only takes effect on a new, empty database; ArticleRetention
+        # converts older databases with a one-off VACUUM.
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        # WAL lets the collector write while generate/stats read. Frozen
+        # shards keep their rollback journal so they can be opened read-only.
+        if self.wal:
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
     @contextmanager
     def get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Yield this thread's long-lived connection.
+
+        Connections are opened once per thread and reused, so SQLite's
+        prepared statement cache survives between calls. Any transaction left
+        open by a failing block is rolled back.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
         try:
             yield conn
-        finally:
-            conn.close()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    logger.warning(f"Error closing connection: {e}")
+            self._connections.clear()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def _init_database(self):
         with self.get_connection() as conn:
@@ -46,22 +220,49 @@ class ArticleDatabase:
                     matched_keywords TEXT,
                     is_processed INTEGER DEFAULT 0,
                     is_sent INTEGER DEFAULT 0,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    content_hash TEXT,
+                    section TEXT
                 )
             ''')
+
+            self._ensure_columns(cursor, 'articles', {'content_hash': 'TEXT', 'section': 'TEXT'})
+            self._backfill_sections(cursor)
             
             cursor.execute('''
                 CREATE INDEX IF NOT EXISTS idx_collected_at ON articles(collected_at)
             ''')
+
+            # Composite indexes match get_articles' ORDER BY filter_score DESC,
+            # collected_at DESC so the planner walks them instead of sorting.
+            # They also cover the GROUP BY scans in get_stats, which makes the
+            # old single-column score/relevance/source indexes redundant.
+            for name, columns in (
+                ('idx_ranking', ('filter_score', 'collected_at', 'id')),
+                ('idx_relevance_ranking', ('relevance_level', 'filter_score', 'collected_at', 'id')),
+                ('idx_source_ranking', ('source', 'filter_score', 'collected_at', 'id')),
+                ('idx_section_ranking', ('section', 'filter_score', 'collected_at', 'id')),
+            ):
+                self._ensure_index(cursor, name, 'articles', columns)
+            # Issue selection only looks at recent, still relevant articles
+            # not yet sent.
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_filter_score ON articles(filter_score)
-            ''')
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_relevance_level ON articles(relevance_level)
+                CREATE INDEX IF NOT EXISTS idx_issue_candidates
+                ON articles(collected_at) WHERE is_sent = 0 AND filter_score > 0
             ''')
+            for index in (
+                'idx_filter_score', 'idx_relevance_level', 'idx_source',
+                'idx_unsent_collected_at'
+            ):
+                cursor.execute(f'DROP INDEX IF EXISTS {index}')
+
+            # Keyset pagination compares (filter_score, collected_at, id) as a
+            # row value, which silently skips rows holding NULLs.
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_source ON articles(source)
+                UPDATE articles SET collected_at = COALESCE(created_at, '')
+                WHERE collected_at IS NULL
             ''')
+            cursor.execute('UPDATE articles SET filter_score = 0 WHERE filter_score IS NULL')
             
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS collection_runs (
@@ -73,54 +274,490 @@ class ArticleDatabase:
                     status TEXT DEFAULT 'completed'
                 )
             ''')
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS collection_run_sources (
+                    run_id INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    collected INTEGER DEFAULT 0,
+                    relevant INTEGER DEFAULT 0,
+                    PRIMARY KEY (run_id, source)
+                )
+            ''')
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT,
+                    updated_at TEXT
+                )
+            ''')
+
+            self._init_keywords_table(cursor)
+            self._init_counters(cursor)
+            self._drop_legacy_search_index(cursor)
+            self._init_content_table(cursor)
+            self._init_search_index(cursor)
             
             conn.commit()
             logger.info(f"Database initialized at {self.db_path}")
 
+    def _init_keywords_table(self, cursor: sqlite3.Cursor) -> None:
+        """Create article_keywords, one row per matched keyword per article."""
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'article_keywords'"
+        )
+        exists = cursor.fetchone() is not None
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_keywords (
+                article_id TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                priority INTEGER,
+                PRIMARY KEY (article_id, keyword)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_article_keywords_keyword
+            ON article_keywords(keyword, article_id)
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS article_keywords_delete AFTER DELETE ON articles BEGIN
+                DELETE FROM article_keywords WHERE article_id = old.id;
+            END
+        ''')
+
+        if not exists:
+            cursor.execute('''
+                INSERT OR IGNORE INTO article_keywords (article_id, keyword, priority)
+                SELECT a.id, j.value, NULL
+                FROM articles a, json_each(a.matched_keywords) j
+                WHERE json_valid(a.matched_keywords)
+            ''')
+            logger.info(f"Backfilled {cursor.rowcount} article keywords")
+
+    def _init_counters(self, cursor: sqlite3.Cursor) -> None:
+        """Create article_counts and the triggers that keep it current.
+
+        Holds one row per (dimension, value) for the total, per-source and
+        per-relevance article counts, so get_stats never scans articles.
+        NULL sources and relevance levels are stored as ''.
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'article_counts'"
+        )
+        exists = cursor.fetchone() is not None
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_counts (
+                dimension TEXT NOT NULL,
+                value TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimension, value)
+            ) WITHOUT ROWID
+        ''')
+
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS article_counts_insert AFTER INSERT ON articles BEGIN
+                INSERT INTO article_counts (dimension, value, count)
+                VALUES ('total', '', 1),
+                       ('source', IFNULL(new.source, ''), 1),
+                       ('relevance', IFNULL(new.relevance_level, ''), 1)
+                ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS article_counts_delete AFTER DELETE ON articles BEGIN
+                UPDATE article_counts SET count = count - 1
+                WHERE dimension = 'total' AND value = '';
+                UPDATE article_counts SET count = count - 1
+                WHERE dimension = 'source' AND value = IFNULL(old.source, '');
+                UPDATE article_counts SET count = count - 1
+                WHERE dimension = 'relevance' AND value = IFNULL(old.relevance_level, '');
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS article_counts_update_source
+            AFTER UPDATE OF source ON articles
+            WHEN old.source IS NOT new.source BEGIN
+                UPDATE article_counts SET count = count - 1
+                WHERE dimension = 'source' AND value = IFNULL(old.source, '');
+                INSERT INTO article_counts (dimension, value, count)
+                VALUES ('source', IFNULL(new.source, ''), 1)
+                ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS article_counts_update_relevance
+            AFTER UPDATE OF relevance_level ON articles
+            WHEN old.relevance_level IS NOT new.relevance_level BEGIN
+                UPDATE article_counts SET count = count - 1
+                WHERE dimension = 'relevance' AND value = IFNULL(old.relevance_level, '');
+                INSERT INTO article_counts (dimension, value, count)
+                VALUES ('relevance', IFNULL(new.relevance_level, ''), 1)
+                ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+            END
+        ''')
+
+        if not exists:
+            cursor.execute('''
+                INSERT INTO article_counts (dimension, value, count)
+                SELECT 'total', '', COUNT(*) FROM articles
+                UNION ALL
+                SELECT 'source', IFNULL(source, ''), COUNT(*) FROM articles GROUP BY 2
+                UNION ALL
+                SELECT 'relevance', IFNULL(relevance_level, ''), COUNT(*) FROM articles GROUP BY 2
+            ''')
+            logger.info("Built article counters")
+
+    def _init_content_table(self, cursor: sqlite3.Cursor) -> None:
+        """Create article_content, which holds zlib-compressed article bodies.
+
+        Keeping bodies out of articles keeps listing and sorting queries off
+        large blobs. Bodies still stored inline by older versions are moved
+        here in batches.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_content (
+                article_id TEXT PRIMARY KEY,
+                body BLOB NOT NULL
+            )
+        ''')
+
+        moved = 0
+        last_rowid = 0
+        while True:
+            cursor.execute('''
+                SELECT rowid, id, content FROM articles
+                WHERE rowid > ? AND content IS NOT NULL
+                ORDER BY rowid LIMIT 1000
+            ''', (last_rowid,))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            cursor.executemany(
+                'INSERT OR REPLACE INTO article_content (article_id, body) VALUES (?, ?)',
+                [(row['id'], _deflate_content(row['content'])) for row in rows if row['content']]
+            )
+            cursor.executemany(
+                'UPDATE articles SET content = NULL WHERE rowid = ?',
+                [(row['rowid'],) for row in rows]
+            )
+            last_rowid = rows[-1]['rowid']
+            moved += len(rows)
+
+        if moved:
+            logger.info(f"Moved {moved} article bodies to article_content")
+
+    def _drop_legacy_search_index(self, cursor: sqlite3.Cursor) -> None:
+        """Drop an FTS index that still reads content from articles itself."""
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+        )
+        row = cursor.fetchone()
+        if row and 'article_search_source' not in row[0]:
+            for trigger in ('articles_fts_insert', 'articles_fts_delete', 'articles_fts_update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            cursor.execute('DROP TABLE articles_fts')
+            logger.info("Dropped legacy full-text search index")
+
+    def _init_search_index(self, cursor: sqlite3.Cursor) -> None:
+        """Create the FTS5 index over articles and the triggers that sync it.
+
+        The index reads its documents from article_search_source, a view
+        joining articles with the decompressed body from article_content.
+        Triggers on both tables keep it in sync: each 'delete' must pass the
+        exact values that were indexed, so they always read the other
+        table's current value.
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+        )
+        exists = cursor.fetchone() is not None
+
+        cursor.execute('''
+            CREATE VIEW IF NOT EXISTS article_search_source AS
+            SELECT a.rowid AS doc_id, a.title, a.description,
+                   inflate_content(c.body) AS content
+            FROM articles a
+            LEFT JOIN article_content c ON c.article_id = a.id
+        ''')
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, description, content,
+                content='article_search_source',
+                content_rowid='doc_id',
+                tokenize='porter unicode61 remove_diacritics 2'
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts(rowid, title, description, content)
+                VALUES (
+                    new.rowid, new.title, new.description,
+                    (SELECT inflate_content(body) FROM article_content WHERE article_id = new.id)
+                );
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, description, content)
+                VALUES (
+                    'delete', old.rowid, old.title, old.description,
+                    (SELECT inflate_content(body) FROM article_content WHERE article_id = old.id)
+                );
+                DELETE FROM article_content WHERE article_id = old.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_fts_update
+            AFTER UPDATE OF title, description ON articles BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, description, content)
+                VALUES (
+                    'delete', old.rowid, old.title, old.description,
+                    (SELECT inflate_content(body) FROM article_content WHERE article_id = old.id)
+                );
+                INSERT INTO articles_fts(rowid, title, description, content)
+                VALUES (
+                    new.rowid, new.title, new.description,
+                    (SELECT inflate_content(body) FROM article_content WHERE article_id = new.id)
+                );
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS article_content_fts_insert
+            AFTER INSERT ON article_content BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, description, content)
+                SELECT 'delete', a.rowid, a.title, a.description, NULL
+                FROM articles a WHERE a.id = new.article_id;
+                INSERT INTO articles_fts(rowid, title, description, content)
+                SELECT a.rowid, a.title, a.description, inflate_content(new.body)
+                FROM articles a WHERE a.id = new.article_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS article_content_fts_update
+            AFTER UPDATE OF body ON article_content BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, description, content)
+                SELECT 'delete', a.rowid, a.title, a.description, inflate_content(old.body)
+                FROM articles a WHERE a.id = old.article_id;
+                INSERT INTO articles_fts(rowid, title, description, content)
+                SELECT a.rowid, a.title, a.description, inflate_content(new.body)
+                FROM articles a WHERE a.id = new.article_id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS article_content_fts_delete
+            AFTER DELETE ON article_content BEGIN
+                INSERT INTO articles_fts(articles_fts, rowid, title, description, content)
+                SELECT 'delete', a.rowid, a.title, a.description, inflate_content(old.body)
+                FROM articles a WHERE a.id = old.article_id;
+                INSERT INTO articles_fts(rowid, title, description, content)
+                SELECT a.rowid, a.title, a.description, NULL
+                FROM articles a WHERE a.id = old.article_id;
+            END
+        ''')
+
+        if not exists:
+            cursor.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+            logger.info("Built full-text search index")
+
+    def _ensure_columns(self, cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]) -> None:
+        """Add columns missing from databases created by older versions."""
+        cursor.execute(f'PRAGMA table_info({table})')
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+                logger.info(f"Added column {table}.{name}")
+
+    def _ensure_index(
+        self,
+        cursor: sqlite3.Cursor,
+        name: str,
+        table: str,
+        columns: Tuple[str, ...]
+    ) -> None:
+        """Create an index, rebuilding it if an older version has other columns."""
+        cursor.execute(f'PRAGMA index_info({name})')
+        existing = tuple(row['name'] for row in cursor.fetchall())
+        if existing == columns:
+            return
+        if existing:
+            cursor.execute(f'DROP INDEX {name}')
+            logger.info(f"Rebuilding index {name} on {', '.join(columns)}")
+        cursor.execute(f'CREATE INDEX {name} ON {table}({", ".join(columns)})')
+
+    def _backfill_sections(self, cursor: sqlite3.Cursor) -> None:
+        """Classify rows stored before the section column existed."""
+        cursor.execute('''
+            SELECT id, matched_keywords, filter_category, source, description, title
+            FROM articles WHERE section IS NULL
+        ''')
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        cursor.executemany('UPDATE articles SET section = ? WHERE id = ?', [
+            (self.section_classifier.classify(dict(row)), row['id']) for row in rows
+        ])
+        logger.info(f"Assigned newsletter sections to {len(rows)} articles")
+
+    def _content_hash(self, article: Dict[str, Any]) -> str:
+        """Hash of the stored fields that identify a change to an article.
+
+        published_at and collected_at are left out: sources without a date
+        fill them with the current time, which would make every sighting
+        look like an edit.
+        """
+        hashed = [article.get(key) for key in self.HASHED_FIELDS]
+        payload = json.dumps(hashed, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _article_params(self, article: Dict[str, Any]) -> Tuple[Any, ...]:
+        return self._article_fields(article) + (self._content_hash(article),)
+
+    def _article_fields(self, article: Dict[str, Any]) -> Tuple[Any, ...]:
+        # content is stored compressed in article_content, not inline.
+        return (
+            article.get('id'),
+            article.get('title'),
+            article.get('url'),
+            article.get('description'),
+            None,
+            article.get('source'),
+            article.get('category'),
+            article.get('priority', 2),
+            article.get('published_at'),
+            article.get('collected_at') or datetime.now().isoformat(),
+            article.get('type'),
+            article.get('filter_score') or 0,
+            article.get('filter_category'),
+            article.get('relevance_level'),
+            json.dumps(article.get('matched_keywords', [])),
+            article.get('section') or self.section_classifier.classify(article)
+        )
+
+    def _keyword_rows(self, article: Dict[str, Any]) -> List[Tuple[Any, ...]]:
+        priorities = article.get('keyword_priorities') or {}
+        return [
+            (article.get('id'), keyword, priorities.get(keyword))
+            for keyword in article.get('matched_keywords') or []
+        ]
+
+    def _changed_rows(
+        self,
+        conn: sqlite3.Connection,
+        rows: List[Tuple[Dict[str, Any], Tuple[Any, ...]]]
+    ) -> List[Tuple[Dict[str, Any], Tuple[Any, ...]]]:
+        """Drop rows whose stored content_hash already matches."""
+        if not rows:
+            return rows
+        ids = [params[0] for _, params in rows]
+        placeholders = ','.join('?' * len(ids))
+        existing = {
+            row[0]: row[1]
+            for row in conn.execute(
+                f'SELECT id, content_hash FROM articles WHERE id IN ({placeholders})', ids
+            )
+        }
+        return [
+            (article, params) for article, params in rows
+            if existing.get(params[0]) != params[-1]
+        ]
+
+    def _write_rows(
+        self,
+        conn: sqlite3.Connection,
+        rows: List[Tuple[Dict[str, Any], Tuple[Any, ...]]]
+    ) -> None:
+        conn.executemany(self.INSERT_ARTICLE_SQL, [params for _, params in rows])
+        conn.executemany('''
+            INSERT INTO article_content (article_id, body) VALUES (?, ?)
+            ON CONFLICT(article_id) DO UPDATE SET body = excluded.body
+        ''', [
+            (params[0], _deflate_content(article.get('content')))
+            for article, params in rows if article.get('content')
+        ])
+        conn.executemany(
+            'DELETE FROM article_content WHERE article_id = ?',
+            [(params[0],) for article, params in rows if not article.get('content')]
+        )
+        conn.executemany(
+            'DELETE FROM article_keywords WHERE article_id = ?',
+            [(params[0],) for _, params in rows]
+        )
+        conn.executemany(
+            'INSERT OR REPLACE INTO article_keywords (article_id, keyword, priority) VALUES (?, ?, ?)',
+            [keyword_row for article, _ in rows for keyword_row in self._keyword_rows(article)]
+        )
+
     def insert_article(self, article: Dict[str, Any]) -> bool:
+        result = self.bulk_insert_articles([article])
+        return not result.errors
+
+    def insert_articles(self, articles: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        result = self.bulk_insert_articles(articles, batch_size=batch_size)
+        return result.inserted
+
+    def bulk_insert_articles(
+        self,
+        articles: List[Dict[str, Any]],
+        batch_size: int = 500
+    ) -> BulkInsertResult:
+        """Insert articles with one connection and one transaction per batch.
+
+        Rows whose content hash is already stored are skipped up front; the
+        rest are written with a single executemany, together with their
+        article_keywords rows. If a batch fails, it is rolled back and
+        retried row by row so that only the bad rows are dropped and
+        reported in ``errors``.
+        """
+        result = BulkInsertResult()
+        batch_size = max(1, batch_size)
+
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            try:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO articles (
-                        id, title, url, description, content, source,
-                        category, priority, published_at, collected_at,
-                        article_type, filter_score, filter_category,
-                        relevance_level, matched_keywords, is_processed
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
-                ''', (
-                    article.get('id'),
-                    article.get('title'),
-                    article.get('url'),
-                    article.get('description'),
-                    article.get('content'),
-                    article.get('source'),
-                    article.get('category'),
-                    article.get('priority', 2),
-                    article.get('published_at'),
-                    article.get('collected_at'),
-                    article.get('type'),
-                    article.get('filter_score', 0),
-                    article.get('filter_category'),
-                    article.get('relevance_level'),
-                    json.dumps(article.get('matched_keywords', []))
-                ))
-                
+            for start in range(0, len(articles), batch_size):
+                batch = articles[start:start + batch_size]
+
+                rows = []
+                for article in batch:
+                    try:
+                        rows.append((article, self._article_params(article)))
+                    except (TypeError, ValueError) as e:
+                        result.errors.append((article.get('id'), str(e)))
+
+                changed = self._changed_rows(conn, rows)
+                result.unchanged += len(rows) - len(changed)
+
+                try:
+                    self._write_rows(conn, changed)
+                    conn.commit()
+                    result.inserted += len(changed)
+                    continue
+                except sqlite3.Error as e:
+                    conn.rollback()
+                    logger.warning(f"Batch insert failed, retrying row by row: {e}")
+
+                for row in changed:
+                    conn.execute('SAVEPOINT insert_row')
+                    try:
+                        self._write_rows(conn, [row])
+                        conn.execute('RELEASE insert_row')
+                        result.inserted += 1
+                    except sqlite3.Error as e:
+                        conn.execute('ROLLBACK TO insert_row')
+                        conn.execute('RELEASE insert_row')
+                        result.errors.append((row[0].get('id'), str(e)))
                 conn.commit()
-                return True
-            
-            except sqlite3.Error as e:
-                logger.error(f"Error inserting article {article.get('id')}: {e}")
-                return False
-
-    def insert_articles(self, articles: List[Dict[str, Any]]) -> int:
-        inserted = 0
-        for article in articles:
-            if self.insert_article(article):
-                inserted += 1
-        logger.info(f"Inserted {inserted} articles into database")
-        return inserted
+
+        for article_id, error in result.errors:
+            logger.error(f"Error inserting article {article_id}: {error}")
+        logger.info(
+            f"Inserted {result.inserted} articles into database "
+            f"({result.unchanged} unchanged)"
+        )
+        return result
 
     def get_articles(
         self,
@@ -128,44 +765,354 @@ class ArticleDatabase:
         relevance_level: Optional[str] = None,
         source: Optional[str] = None,
         since: Optional[str] = None,
-        unprocessed_only: bool = False
+        unprocessed_only: bool = False,
+        include_content: bool = False,
+        section: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            query = 'SELECT * FROM articles WHERE 1=1'
-            params = []
-            
-            if relevance_level:
-                query += ' AND relevance_level = ?'
-                params.append(relevance_level)
-            
-            if source:
-                query += ' AND source = ?'
-                params.append(source)
-            
-            if since:
-                query += ' AND collected_at >= ?'
-                params.append(since)
-            
-            if unprocessed_only:
-                query += ' AND is_processed = 0'
-            
-            query += ' ORDER BY filter_score DESC, collected_at DESC LIMIT ?'
-            params.append(limit)
+            query, params = self._build_articles_query(
+                limit, relevance_level, source, since, unprocessed_only, section=section
+            )
             
             cursor.execute(query, params)
             rows = cursor.fetchall()
             
-            articles = []
-            for row in rows:
-                article = dict(row)
-                article['matched_keywords'] = json.loads(article['matched_keywords'] or '[]')
+            articles = [self._row_to_article(row) for row in rows]
+
+        if include_content:
+            contents = self.get_contents([a['id'] for a in articles])
+            for article in articles:
+                article['content'] = contents.get(article['id'], '')
+
+        return articles
+
+    def get_content(self, article_id: str) -> str:
+        return self.get_contents([article_id]).get(article_id, '')
+
+    def get_contents(self, article_ids: List[str]) -> Dict[str, str]:
+        """Load and decompress bodies for the given articles."""
+        contents: Dict[str, str] = {}
+        with self.get_connection() as conn:
+            for start in range(0, len(article_ids), 500):
+                chunk = article_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for row in conn.execute(
+                    f'SELECT article_id, body FROM article_content WHERE article_id IN ({placeholders})',
+                    chunk
+                ):
+                    contents[row[0]] = _inflate_content(row[1])
+        return contents
+
+    def _row_to_article(self, row: sqlite3.Row) -> Dict[str, Any]:
+        article = dict(row)
+        article['matched_keywords'] = json.loads(article['matched_keywords'] or '[]')
+        return article
+
+    def load_articles(self, article_ids: List[str]) -> List[Dict[str, Any]]:
+        """Full article dicts, in the shape bulk_insert_articles accepts.
+
+        Includes decompressed content and keyword_priorities, so the result
+        can be re-scored and written back.
+        """
+        with self.get_connection() as conn:
+            return self._load_articles(conn, article_ids)
+
+    def _load_articles(
+        self,
+        conn: sqlite3.Connection,
+        article_ids: List[str],
+        schema: str = 'main'
+    ) -> List[Dict[str, Any]]:
+        """``load_articles`` over ``conn``, reading the tables of ``schema``."""
+        articles: List[Dict[str, Any]] = []
+        for start in range(0, len(article_ids), 500):
+            chunk = article_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            contents = {
+                row[0]: _inflate_content(row[1])
+                for row in conn.execute(
+                    f'SELECT article_id, body FROM {schema}.article_content WHERE article_id IN ({placeholders})',
+                    chunk
+                )
+            }
+            priorities: Dict[str, Dict[str, int]] = {}
+            for row in conn.execute(
+                f'SELECT article_id, keyword, priority FROM {schema}.article_keywords WHERE article_id IN ({placeholders})',
+                chunk
+            ):
+                priorities.setdefault(row[0], {})[row[1]] = row[2]
+
+            for row in conn.execute(f'SELECT * FROM {schema}.articles WHERE id IN ({placeholders})', chunk):
+                article = self._row_to_article(row)
+                article['type'] = article.pop('article_type', None)
+                # Bookkeeping columns are not article fields.
+                for column in ('is_processed', 'is_sent', 'created_at', 'content_hash'):
+                    article.pop(column, None)
+                article['content'] = contents.get(article['id'], '')
+                article['keyword_priorities'] = priorities.get(article['id'], {})
                 articles.append(article)
-            
-            return articles
+        return articles
+
+    def get_article_ids_by_keywords(self, keywords: List[str]) -> List[str]:
+        """Ids of articles that matched any of ``keywords``."""
+        if not keywords:
+            return []
+        with self.get_connection() as conn:
+            placeholders = ','.join('?' * len(keywords))
+            cursor = conn.execute(
+                f'SELECT DISTINCT article_id FROM article_keywords WHERE keyword IN ({placeholders})',
+                [keyword.lower() for keyword in keywords]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def match_article_ids(self, match: str) -> List[str]:
+        """Ids of articles matching an FTS5 query over title, description and content."""
+        with self.get_connection() as conn:
+            cursor = conn.execute('''
+                SELECT a.id FROM articles_fts
+                JOIN articles a ON a.rowid = articles_fts.rowid
+                WHERE articles_fts MATCH ?
+            ''', (match,))
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_articles_by_keyword(self, keyword: str, limit: int = 100) -> List[Dict[str, Any]]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT a.* FROM article_keywords k
+                JOIN articles a ON a.id = k.article_id
+                WHERE k.keyword = ?
+                ORDER BY a.filter_score DESC, a.collected_at DESC, a.id DESC
+                LIMIT ?
+            ''', (keyword.lower(), limit))
+            return [self._row_to_article(row) for row in cursor.fetchall()]
+
+    def get_top_keywords(self, limit: int = 10, since: Optional[str] = None) -> Dict[str, int]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if since:
+                cursor.execute('''
+                    SELECT k.keyword, COUNT(*) AS count
+                    FROM articles a
+                    JOIN article_keywords k ON k.article_id = a.id
+                    WHERE a.collected_at >= ?
+                    GROUP BY k.keyword
+                    ORDER BY count DESC
+                    LIMIT ?
+                ''', (since, limit))
+            else:
+                cursor.execute('''
+                    SELECT keyword, COUNT(*) AS count
+                    FROM article_keywords
+                    GROUP BY keyword
+                    ORDER BY count DESC
+                    LIMIT ?
+                ''', (limit,))
+            return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def _build_articles_query(
+        self,
+        limit: int = 100,
+        relevance_level: Optional[str] = None,
+        source: Optional[str] = None,
+        since: Optional[str] = None,
+        unprocessed_only: bool = False,
+        after: Optional[Tuple[float, str, str]] = None,
+        table: str = 'articles',
+        section: Optional[str] = None
+    ) -> Tuple[str, List[Any]]:
+        query = f'SELECT * FROM {table} WHERE 1=1'
+        params: List[Any] = []
+        
+        if relevance_level:
+            query += ' AND relevance_level = ?'
+            params.append(relevance_level)
+        
+        if source:
+            query += ' AND source = ?'
+            params.append(source)
+
+        if section:
+            query += ' AND section = ?'
+            params.append(section)
+        
+        if since:
+            query += ' AND collected_at >= ?'
+            params.append(since)
+        
+        if unprocessed_only:
+            query += ' AND is_processed = 0'
+
+        if after:
+            query += ' AND (filter_score, collected_at, id) < (?, ?, ?)'
+            params.extend(after)
+        
+        query += ' ORDER BY filter_score DESC, collected_at DESC, id DESC LIMIT ?'
+        params.append(limit)
+        
+        return query, params
+
+    def _build_ranked_query(
+        self,
+        per_section: int,
+        since: str,
+        now: str,
+        decay_days: float,
+        tables: Optional[List[str]] = None,
+        shard_labels: Optional[List[str]] = None
+    ) -> Tuple[str, List[Any]]:
+        """Top ``per_section`` unsent articles per section since ``since``.
+
+        Articles the rescorer found no longer relevant keep a zero score and
+        are left out.
+
+        ``decayed_score`` is ``filter_score / (1 + age_days / decay_days)``,
+        so a story's score halves once it is ``decay_days`` old. Several
+        tables (attached shards) are ranked together as one UNION ALL.
+        """
+        tables = tables or ['articles']
+        parts: List[str] = []
+        params: List[Any] = []
+        for i, table in enumerate(tables):
+            label = f", '{shard_labels[i]}' AS shard" if shard_labels else ''
+            parts.append(f'''
+                SELECT *{label},
+                    filter_score / (1.0 + MAX(julianday(?) - julianday(collected_at), 0.0) / ?)
+                        AS decayed_score
+                FROM {table}
+                WHERE is_sent = 0 AND filter_score > 0 AND collected_at >= ?
+            ''')
+            params.extend([now, decay_days, since])
+
+        query = f'''
+            WITH candidates AS ({' UNION ALL '.join(parts)}),
+            ranked AS (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY section
+                    ORDER BY decayed_score DESC, collected_at DESC, id DESC
+                ) AS section_rank
+                FROM candidates
+            )
+            SELECT * FROM ranked
+            WHERE section_rank <= ?
+            ORDER BY section, section_rank
+        '''
+        params.append(per_section)
+        return query, params
+
+    def get_ranked_articles(
+        self,
+        per_section: int = 5,
+        window_days: int = 7,
+        decay_days: float = 3.0,
+        now: Optional[datetime] = None,
+        include_content: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Newsletter candidates: the best recent unsent articles of each section.
+
+        Articles collected in the last ``window_days`` are ranked within
+        their section by recency-decayed score, so last month's high scorers
+        do not crowd out this week's news, and every section gets up to
+        ``per_section`` articles.
+        """
+        now = now or datetime.now()
+        since = (now - timedelta(days=window_days)).isoformat()
+        query, params = self._build_ranked_query(per_section, since, now.isoformat(), decay_days)
+
+        with self.get_connection() as conn:
+            articles = [self._row_to_article(row) for row in conn.execute(query, params)]
+
+        if include_content:
+            contents = self.get_contents([a['id'] for a in articles])
+            for article in articles:
+                article['content'] = contents.get(article['id'], '')
+
+        return articles
+
+    def iter_articles(
+        self,
+        batch_size: int = 1000,
+        relevance_level: Optional[str] = None,
+        source: Optional[str] = None,
+        since: Optional[str] = None,
+        section: Optional[str] = None
+    ) -> Iterator[ArticleRecord]:
+        """Stream articles in get_articles order with constant memory.
+
+        Pages through the table with keyset pagination on
+        ``(filter_score, collected_at, id)`` rather than OFFSET, so each page
+        is an index seek. Rows are yielded as ArticleRecord, which decodes
+        matched_keywords and loads content only when they are read.
+        """
+        after = None
+        while True:
+            query, params = self._build_articles_query(
+                batch_size, relevance_level, source, since, after=after, section=section
+            )
+            with self.get_connection() as conn:
+                rows = conn.execute(query, params).fetchall()
+
+            for row in rows:
+                yield ArticleRecord(row, content_loader=self.get_content)
+
+            if len(rows) < batch_size:
+                return
+            last = rows[-1]
+            after = (last['filter_score'], last['collected_at'], last['id'])
+
+    def explain_query_plan(self, query: str, params: List[Any]) -> List[str]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'EXPLAIN QUERY PLAN {query}', params)
+            return [row['detail'] for row in cursor.fetchall()]
+
+    def _fts_query(self, text: str) -> str:
+        """Quote each term so user input never trips FTS5 query syntax."""
+        terms = [term.replace('"', '""') for term in text.split()]
+        return ' '.join(f'"{term}"' for term in terms if term)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        raw: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Full-text search over title, description and content.
+
+        Results are ranked by bm25 with title matches weighted highest.
+        Terms are ANDed; pass ``raw=True`` to use FTS5 query syntax directly
+        (phrases, OR, NEAR, prefix*).
+        """
+        match = query if raw else self._fts_query(query)
+        if not match:
+            return []
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute('''
+                    SELECT
+                        a.id, a.title, a.url, a.source, a.published_at,
+                        a.collected_at, a.filter_score, a.relevance_level,
+                        bm25(articles_fts, 10.0, 5.0, 1.0) AS rank,
+                        snippet(articles_fts, -1, '**', '**', '...', 16) AS snippet
+                    FROM articles_fts
+                    JOIN articles a ON a.rowid = articles_fts.rowid
+                    WHERE articles_fts MATCH ?
+                    ORDER BY rank
+                    LIMIT ?
+                ''', (match, limit))
+            except sqlite3.OperationalError as e:
+                logger.error(f"Invalid search query {query!r}: {e}")
+                return []
+
+            return [dict(row) for row in cursor.fetchall()]
 
     def mark_as_sent(self, article_ids: List[str]) -> None:
+        if not article_ids:
+            return
         with self.get_connection() as conn:
             cursor = conn.cursor()
             placeholders = ','.join('?' * len(article_ids))
@@ -180,8 +1127,14 @@ class ArticleDatabase:
         rss_count: int,
         scraped_count: int,
         filtered_count: int,
-        status: str = 'completed'
+        status: str = 'completed',
+        by_source: Optional[Dict[str, Dict[str, int]]] = None
     ) -> int:
+        """Record a collection run.
+
+        ``by_source`` maps each source name to its ``collected`` and
+        ``relevant`` counts for this run and feeds get_source_history.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -195,36 +1148,58 @@ class ArticleDatabase:
                 filtered_count,
                 status
             ))
+            run_id = cursor.lastrowid
+
+            if by_source:
+                cursor.executemany('''
+                    INSERT INTO collection_run_sources (run_id, source, collected, relevant)
+                    VALUES (?, ?, ?, ?)
+                ''', [
+                    (run_id, source, counts.get('collected', 0), counts.get('relevant', 0))
+                    for source, counts in by_source.items()
+                ])
+
             conn.commit()
-            return cursor.lastrowid
+            return run_id
+
+    def get_source_history(
+        self,
+        source: Optional[str] = None,
+        runs: int = 30
+    ) -> List[Dict[str, Any]]:
+        """Per-run, per-source collected/relevant counts for the latest runs."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            query = '''
+                SELECT r.id AS run_id, r.run_at, s.source, s.collected, s.relevant
+                FROM (SELECT id, run_at FROM collection_runs ORDER BY id DESC LIMIT ?) r
+                JOIN collection_run_sources s ON s.run_id = r.id
+            '''
+            params: List[Any] = [runs]
+            if source:
+                query += ' WHERE s.source = ?'
+                params.append(source)
+            query += ' ORDER BY r.id DESC, s.source'
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_stats(self) -> Dict[str, Any]:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            cursor.execute('SELECT COUNT(*) FROM articles')
-            total_articles = cursor.fetchone()[0]
-            
-            cursor.execute('''
-                SELECT COUNT(*) FROM articles 
-                WHERE relevance_level IN ('high', 'medium')
-            ''')
-            relevant_articles = cursor.fetchone()[0]
-            
             cursor.execute('''
-                SELECT source, COUNT(*) as count 
-                FROM articles 
-                GROUP BY source 
-                ORDER BY count DESC
+                SELECT dimension, value, count FROM article_counts
+                WHERE count > 0
+                ORDER BY dimension, count DESC
             ''')
-            by_source = {row[0]: row[1] for row in cursor.fetchall()}
+            counts: Dict[str, Dict[Optional[str], int]] = {'total': {}, 'source': {}, 'relevance': {}}
+            for dimension, value, count in cursor.fetchall():
+                counts.setdefault(dimension, {})[value or None] = count
             
-            cursor.execute('''
-                SELECT relevance_level, COUNT(*) as count 
-                FROM articles 
-                GROUP BY relevance_level
-            ''')
-            by_relevance = {row[0]: row[1] for row in cursor.fetchall()}
+            total_articles = counts['total'].get(None, 0)
+            by_source = counts['source']
+            by_relevance = counts['relevance']
+            relevant_articles = by_relevance.get('high', 0) + by_relevance.get('medium', 0)
             
             cursor.execute('''
                 SELECT collected_at FROM articles 
@@ -241,18 +1216,35 @@ class ArticleDatabase:
                 'last_collection': last_collection
             }
 
-    def cleanup_old_articles(self, days: int = 30) -> int:
+    def cleanup_old_articles(
+        self,
+        days: int = 30,
+        archive_dir: Optional[str] = 'data/archive',
+        batch_size: int = 500
+    ) -> int:
+        """Archive and delete sent articles older than ``days``.
+
+        See ArticleRetention: deletes run in small batches, expired rows are
+        archived to gzipped JSONL under ``archive_dir`` first (pass None to
+        skip archiving), and freed pages are returned with incremental_vacuum.
+        """
+        from .retention import ArticleRetention
+
+        retention = ArticleRetention(self, archive_dir=archive_dir, batch_size=batch_size)
+        return retention.run(days=days)
+
+    def get_setting(self, key: str) -> Optional[str]:
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                DELETE FROM articles 
-                WHERE collected_at < datetime('now', ?)
-                AND is_sent = 1
-            ''', (f'-{days} days',))
-            deleted = cursor.rowcount
+            row = conn.execute('SELECT value FROM settings WHERE key = ?', (key,)).fetchone()
+            return row[0] if row else None
+
+    def set_setting(self, key: str, value: str) -> None:
+        with self.get_connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO settings (key, value, updated_at)
+                VALUES (?, ?, ?)
+            ''', (key, value, datetime.now().isoformat()))
             conn.commit()
-            logger.info(f"Cleaned up {deleted} old articles")
-            return deleted
 
     def get_collection_count(self) -> int:
         """Get number of collection runs for newsletter issue numbering."""
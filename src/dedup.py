@@ -0,0 +1,321 @@
+import re
+import zlib
+import random
+import sqlite3
+import logging
+import threading
+from array import array
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Mersenne prime used by the MinHash permutations.
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+class NearDuplicateDetector:
+    """Ingest-time near-duplicate detection with MinHash and LSH.
+
+    Each article's title and description are shingled into word n-grams and
+    reduced to a MinHash signature. Signatures are split into LSH bands;
+    articles sharing any band bucket are candidates, and a candidate whose
+    estimated Jaccard similarity reaches ``threshold`` is a duplicate. A
+    lookup only touches the buckets for one article, so its cost depends on
+    bucket sizes rather than on the size of the archive.
+
+    The first article seen in a cluster is canonical. Later duplicates are
+    recorded in ``article_duplicates`` against it instead of being stored
+    as separate articles, and are listed with it in the newsletter.
+    Signatures older than ``window_days`` are pruned, since the same story
+    is rarely republished weeks later.
+
+    The tables live in the article store (the catalog when sharded; see
+    ``store_path``), next to the articles they refer to.
+    """
+
+    def __init__(
+        self,
+        db_path: str = 'data/newsletter.db',
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        threshold: float = 0.6,
+        window_days: int = 14
+    ):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.db_path = db_path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.window_days = window_days
+
+        # Fixed seed: signatures must stay comparable across runs.
+        rng = random.Random(1)
+        self._permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._lock = threading.Lock()
+        self._init_database()
+
+    @contextmanager
+    def get_connection(self):
+        # The article store's writer thread may hold the write lock.
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_database(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS minhash_signatures (
+                    article_id TEXT PRIMARY KEY,
+                    signature BLOB NOT NULL,
+                    collected_at TEXT
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_minhash_collected_at
+                ON minhash_signatures(collected_at)
+            ''')
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS lsh_buckets (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    article_id TEXT NOT NULL,
+                    PRIMARY KEY (band, bucket, article_id)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_lsh_buckets_article
+                ON lsh_buckets(article_id)
+            ''')
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS article_duplicates (
+                    article_id TEXT PRIMARY KEY,
+                    canonical_id TEXT NOT NULL,
+                    title TEXT,
+                    url TEXT,
+                    source TEXT,
+                    similarity REAL,
+                    detected_at TEXT
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_article_duplicates_canonical
+                ON article_duplicates(canonical_id)
+            ''')
+
+            conn.commit()
+            logger.info(f"Duplicate index initialized at {self.db_path}")
+
+    def _shingles(self, article: Dict[str, Any]) -> List[int]:
+        text = f"{article.get('title') or ''} {article.get('description') or ''}".lower()
+        tokens = TOKEN_PATTERN.findall(text)
+        size = min(self.shingle_size, len(tokens))
+        if size == 0:
+            return []
+        return list({
+            zlib.crc32(' '.join(tokens[i:i + size]).encode('utf-8'))
+            for i in range(len(tokens) - size + 1)
+        })
+
+    def signature(self, article: Dict[str, Any]) -> Optional[array]:
+        shingles = self._shingles(article)
+        if not shingles:
+            return None
+        return array('Q', (
+            min((a * shingle + b) % MERSENNE_PRIME for shingle in shingles)
+            for a, b in self._permutations
+        ))
+
+    def _band_buckets(self, signature: array) -> List[Tuple[int, int]]:
+        rows = self.rows_per_band
+        return [
+            (band, zlib.crc32(signature[band * rows:(band + 1) * rows].tobytes()))
+            for band in range(self.bands)
+        ]
+
+    def _similarity(self, first: array, second: array) -> float:
+        return sum(1 for x, y in zip(first, second) if x == y) / self.num_perm
+
+    def _find_canonical(
+        self,
+        conn: sqlite3.Connection,
+        article_id: str,
+        signature: array,
+        buckets: List[Tuple[int, int]],
+        cutoff: str
+    ) -> Tuple[Optional[str], float]:
+        # One primary-key seek per band.
+        lookups = ' UNION '.join(
+            'SELECT article_id FROM lsh_buckets WHERE band = ? AND bucket = ?'
+            for _ in buckets
+        )
+        params: List[Any] = [value for bucket in buckets for value in bucket]
+        rows = conn.execute(f'''
+            WITH candidates(article_id) AS ({lookups})
+            SELECT s.article_id, s.signature
+            FROM candidates c
+            JOIN minhash_signatures s ON s.article_id = c.article_id
+            WHERE s.collected_at >= ? AND s.article_id != ?
+        ''', params + [cutoff, article_id]).fetchall()
+
+        best_id, best_similarity = None, 0.0
+        for row in rows:
+            candidate = array('Q')
+            candidate.frombytes(row['signature'])
+            similarity = self._similarity(signature, candidate)
+            if similarity > best_similarity:
+                best_id, best_similarity = row['article_id'], similarity
+
+        if best_similarity >= self.threshold:
+            return best_id, best_similarity
+        return None, best_similarity
+
+    def partition(
+        self,
+        articles: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split ``articles`` into ``(canonical, duplicates)``.
+
+        Canonical articles are indexed; each duplicate gets a
+        ``duplicate_of`` key and a row in article_duplicates. Duplicates
+        within the same batch are detected too.
+        """
+        canonical: List[Dict[str, Any]] = []
+        duplicates: List[Dict[str, Any]] = []
+        if not articles:
+            return canonical, duplicates
+
+        now = datetime.now()
+        cutoff = (now - timedelta(days=self.window_days)).isoformat()
+
+        with self._lock, self.get_connection() as conn:
+            for article in articles:
+                article_id = article['id']
+
+                known = conn.execute(
+                    'SELECT canonical_id, similarity FROM article_duplicates WHERE article_id = ?',
+                    (article_id,)
+                ).fetchone()
+                if known:
+                    article['duplicate_of'] = known['canonical_id']
+                    duplicates.append(article)
+                    continue
+
+                signature = self.signature(article)
+                if signature is None:
+                    canonical.append(article)
+                    continue
+
+                buckets = self._band_buckets(signature)
+                canonical_id, similarity = self._find_canonical(
+                    conn, article_id, signature, buckets, cutoff
+                )
+
+                if canonical_id:
+                    article['duplicate_of'] = canonical_id
+                    duplicates.append(article)
+                    conn.execute('''
+                        INSERT OR REPLACE INTO article_duplicates (
+                            article_id, canonical_id, title, url, source, similarity, detected_at
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', (
+                        article_id, canonical_id, article.get('title'), article.get('url'),
+                        article.get('source'), similarity, now.isoformat()
+                    ))
+                    continue
+
+                canonical.append(article)
+                conn.execute('''
+                    INSERT OR REPLACE INTO minhash_signatures (article_id, signature, collected_at)
+                    VALUES (?, ?, ?)
+                ''', (article_id, signature.tobytes(), article.get('collected_at') or now.isoformat()))
+                conn.executemany(
+                    'INSERT OR IGNORE INTO lsh_buckets (band, bucket, article_id) VALUES (?, ?, ?)',
+                    [(band, bucket, article_id) for band, bucket in buckets]
+                )
+
+            conn.commit()
+
+        if duplicates:
+            logger.info(f"Detected {len(duplicates)} near-duplicate articles")
+        return canonical, duplicates
+
+    def forget(self, article_ids: List[str]) -> int:
+        """Unindex canonical articles that could not be stored.
+
+        Their signatures are removed, along with the duplicates recorded
+        against them, so the story is treated as new when it comes back.
+        """
+        removed = 0
+        with self._lock, self.get_connection() as conn:
+            for start in range(0, len(article_ids), 500):
+                chunk = article_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                conn.execute(f'DELETE FROM lsh_buckets WHERE article_id IN ({placeholders})', chunk)
+                removed += conn.execute(
+                    f'DELETE FROM minhash_signatures WHERE article_id IN ({placeholders})', chunk
+                ).rowcount
+                conn.execute(
+                    f'DELETE FROM article_duplicates WHERE canonical_id IN ({placeholders})', chunk
+                )
+            conn.commit()
+        if removed:
+            logger.info(f"Removed {removed} unstored articles from the duplicate index")
+        return removed
+
+    def get_duplicates(self, canonical_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Recorded duplicates for each canonical article."""
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        with self.get_connection() as conn:
+            for start in range(0, len(canonical_ids), 500):
+                chunk = canonical_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for row in conn.execute(f'''
+                    SELECT * FROM article_duplicates
+                    WHERE canonical_id IN ({placeholders})
+                    ORDER BY detected_at
+                ''', chunk):
+                    result.setdefault(row['canonical_id'], []).append(dict(row))
+        return result
+
+    def attach_duplicates(self, articles: List[Dict[str, Any]]) -> None:
+        """Set each article's ``duplicates`` to the copies recorded against it."""
+        duplicates = self.get_duplicates([article['id'] for article in articles])
+        for article in articles:
+            article['duplicates'] = duplicates.get(article['id'], [])
+
+    def prune(self) -> int:
+        """Drop signatures and duplicate records older than the window."""
+        cutoff = (datetime.now() - timedelta(days=self.window_days)).isoformat()
+        with self._lock, self.get_connection() as conn:
+            conn.execute('''
+                DELETE FROM lsh_buckets WHERE article_id IN (
+                    SELECT article_id FROM minhash_signatures WHERE collected_at < ?
+                )
+            ''', (cutoff,))
+            deleted = conn.execute(
+                'DELETE FROM minhash_signatures WHERE collected_at < ?', (cutoff,)
+            ).rowcount
+            conn.execute('DELETE FROM article_duplicates WHERE detected_at < ?', (cutoff,))
+            conn.commit()
+        if deleted:
+            logger.info(f"Pruned {deleted} expired duplicate signatures")
+        return deleted
@@ -0,0 +1,174 @@
+import json
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional, Any
+from datetime import datetime
+from contextlib import contextmanager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FetchCache:
+    """Persistent per-URL fetch state.
+
+    Records the ETag / Last-Modified headers returned for each feed or page
+    URL so the next run can send If-None-Match / If-Modified-Since and skip
+    unchanged sources on a 304, and a per-feed high-water mark (recently
+    seen GUIDs and newest published timestamp) for incremental RSS
+    collection.
+
+    State observed during a collection run is staged with ``stage_*`` and
+    only written by ``commit_pending`` once the run's articles are stored;
+    otherwise a failed insert would make the next run skip them for good.
+    """
+
+    # GUIDs remembered per feed; comfortably more than a feed lists at once.
+    MAX_SEEN_GUIDS = 500
+
+    def __init__(self, db_path: str = 'data/fetch_cache.db'):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._pending_validators: Dict[str, Dict[str, Optional[str]]] = {}
+        self._pending_watermarks: Dict[str, Dict[str, Any]] = {}
+        self._init_database()
+
+    @contextmanager
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_database(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS http_validators (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    updated_at TEXT
+                )
+            ''')
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS feed_watermarks (
+                    feed_url TEXT PRIMARY KEY,
+                    last_guid TEXT,
+                    last_published TEXT,
+                    updated_at TEXT,
+                    seen_guids TEXT
+                )
+            ''')
+            cursor.execute('PRAGMA table_info(feed_watermarks)')
+            if 'seen_guids' not in {row[1] for row in cursor.fetchall()}:
+                cursor.execute('ALTER TABLE feed_watermarks ADD COLUMN seen_guids TEXT')
+
+            conn.commit()
+            logger.info(f"Fetch cache initialized at {self.db_path}")
+
+    def get_validators(self, url: str) -> Dict[str, Optional[str]]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT etag, last_modified FROM http_validators WHERE url = ?',
+                (url,)
+            )
+            row = cursor.fetchone()
+            if not row:
+                return {'etag': None, 'last_modified': None}
+            return {'etag': row['etag'], 'last_modified': row['last_modified']}
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        validators = self.get_validators(url)
+        headers = {}
+        if validators['etag']:
+            headers['If-None-Match'] = validators['etag']
+        if validators['last_modified']:
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def save_validators(
+        self,
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str]
+    ) -> None:
+        if not etag and not last_modified:
+            return
+
+        with self._lock, self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO http_validators (url, etag, last_modified, updated_at)
+                VALUES (?, ?, ?, ?)
+            ''', (url, etag, last_modified, datetime.now().isoformat()))
+            conn.commit()
+
+    def get_watermark(self, feed_url: str) -> Optional[Dict[str, Any]]:
+        """``{'seen_guids', 'last_published'}`` or None for a feed not seen before.
+
+        ``seen_guids`` is an insertion-ordered dict (newest first) used as a set.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT last_guid, last_published, seen_guids FROM feed_watermarks WHERE feed_url = ?',
+                (feed_url,)
+            )
+            row = cursor.fetchone()
+            if not row:
+                return None
+            seen = dict.fromkeys(json.loads(row['seen_guids'] or '[]'))
+            if row['last_guid']:
+                seen.setdefault(row['last_guid'])
+            return {'seen_guids': seen, 'last_published': row['last_published']}
+
+    def save_watermark(
+        self,
+        feed_url: str,
+        seen_guids: List[str],
+        last_published: Optional[str]
+    ) -> None:
+        seen_guids = seen_guids[:self.MAX_SEEN_GUIDS]
+        with self._lock, self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO feed_watermarks (
+                    feed_url, last_guid, last_published, updated_at, seen_guids
+                ) VALUES (?, ?, ?, ?, ?)
+            ''', (
+                feed_url, seen_guids[0] if seen_guids else None, last_published,
+                datetime.now().isoformat(), json.dumps(seen_guids)
+            ))
+            conn.commit()
+
+    def stage_validators(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        with self._lock:
+            self._pending_validators[url] = {'etag': etag, 'last_modified': last_modified}
+
+    def stage_watermark(self, feed_url: str, seen_guids: List[str], last_published: Optional[str]) -> None:
+        with self._lock:
+            self._pending_watermarks[feed_url] = {
+                'seen_guids': seen_guids, 'last_published': last_published
+            }
+
+    def commit_pending(self) -> None:
+        """Persist staged validators and watermarks."""
+        with self._lock:
+            validators, self._pending_validators = self._pending_validators, {}
+            watermarks, self._pending_watermarks = self._pending_watermarks, {}
+        for url, values in validators.items():
+            self.save_validators(url, values['etag'], values['last_modified'])
+        for feed_url, mark in watermarks.items():
+            self.save_watermark(feed_url, mark['seen_guids'], mark['last_published'])
+
+    def discard_pending(self) -> None:
+        with self._lock:
+            self._pending_validators.clear()
+            self._pending_watermarks.clear()
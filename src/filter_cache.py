@@ -0,0 +1,136 @@
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FilterCache:
+    """Persistent LRU cache of ContentFilter results.
+
+    Entries are keyed by a hash of an article's normalized text combined
+    with the keyword-config fingerprint, so an article scored before is not
+    scored again while ``parent_keywords`` stays the same. Opening the cache
+    with a different fingerprint drops every entry made under the old one.
+    Once ``max_entries`` is exceeded the least recently used entries are
+    evicted, which bounds the table without a retention pass.
+
+    The table lives in the article store (the catalog when sharded; see
+    ``store_path``).
+    """
+
+    def __init__(
+        self,
+        db_path: str = 'data/newsletter.db',
+        max_entries: int = 50000
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[str] = None
+        self._init_database()
+
+    @contextmanager
+    def get_connection(self):
+        # The article store's writer thread may hold the write lock.
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_database(self):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS filter_results (
+                    cache_key TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_filter_results_last_used
+                ON filter_results(last_used)
+            ''')
+
+            conn.commit()
+            logger.info(f"Filter cache initialized at {self.db_path}")
+
+    def use_fingerprint(self, fingerprint: str) -> None:
+        """Invalidate entries computed under any other keyword config."""
+        if fingerprint == self._fingerprint:
+            return
+        with self._lock, self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM filter_results WHERE fingerprint != ?', (fingerprint,))
+            if cursor.rowcount:
+                logger.info(f"Keyword config changed; dropped {cursor.rowcount} cached filter results")
+            conn.commit()
+        self._fingerprint = fingerprint
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[Any]]:
+        """Return cached results for ``keys`` and mark them as recently used."""
+        results: Dict[str, List[Any]] = {}
+        if not keys:
+            return results
+
+        with self._lock, self.get_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f'SELECT cache_key, result FROM filter_results WHERE cache_key IN ({placeholders})',
+                    chunk
+                )
+                for key, result in cursor.fetchall():
+                    results[key] = json.loads(result)
+
+            if results:
+                now = time.time()
+                cursor.executemany(
+                    'UPDATE filter_results SET last_used = ? WHERE cache_key = ?',
+                    [(now, key) for key in results]
+                )
+                conn.commit()
+
+        return results
+
+    def put_many(self, results: Dict[str, Any]) -> None:
+        if not results:
+            return
+
+        now = time.time()
+        with self._lock, self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO filter_results (cache_key, fingerprint, result, last_used)
+                VALUES (?, ?, ?, ?)
+            ''', [
+                (key, self._fingerprint or '', json.dumps(result), now)
+                for key, result in results.items()
+            ])
+
+            cursor.execute('SELECT COUNT(*) FROM filter_results')
+            excess = cursor.fetchone()[0] - self.max_entries
+            if excess > 0:
+                cursor.execute('''
+                    DELETE FROM filter_results WHERE cache_key IN (
+                        SELECT cache_key FROM filter_results ORDER BY last_used LIMIT ?
+                    )
+                ''', (excess,))
+            conn.commit()
+
+    def clear(self) -> None:
+        with self._lock, self.get_connection() as conn:
+            conn.execute('DELETE FROM filter_results')
+            conn.commit()
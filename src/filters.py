@@ -1,22 +1,45 @@
 import re
+import json
+import hashlib
 import logging
-from typing import List, Dict, Any, Set, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Set, Tuple, Iterable, Iterator, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 
+from .filter_cache import FilterCache
+from .sections import SectionClassifier
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _extract_context(text: str, keyword: str, offset: int, context_length: int = 50) -> str:
+    if offset == -1:
+        return keyword
+    
+    start = max(0, offset - context_length)
+    end = min(len(text), offset + len(keyword) + context_length)
+    return '...' + text[start:end] + '...'
+
+
+@dataclass(slots=True)
 class FilterMatch:
     keyword: str
     category: str
     priority: int
-    context: str
+    # Where the keyword first matched in ``text`` (the lowercased text that
+    # was scored); ``context`` is only sliced out when it is read.
+    offset: int = -1
+    text: str = field(default='', repr=False, compare=False)
 
+    @property
+    def context(self) -> str:
+        return _extract_context(self.text, self.keyword, self.offset)
 
-@dataclass
+
+@dataclass(slots=True)
 class FilterResult:
     is_relevant: bool
     score: float
@@ -25,8 +48,112 @@ class FilterResult:
     relevance_level: str = 'low'
 
 
+def _is_word_char(ch: str) -> bool:
+    # Same definition as re's \w for str patterns.
+    return ch.isalnum() or ch == '_'
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex matching wherever any of ``words`` starts.
+
+    Alternatives are factored through a prefix trie so the regex engine
+    rejects most positions on the first character. A branch stops at the
+    shortest word, since only the start position is needed.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node: Dict[str, Any]) -> str:
+        if '' in node:
+            return ''
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items())]
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """Find every keyword, or its plural, in a single scan of the text.
+
+    One compiled regex locates the word boundaries where some keyword can
+    start; only keywords sharing that first character are then checked
+    there. A keyword matches exactly where ``\\b<keyword>s?\\b`` would.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+        self._by_first_char: Dict[str, List[str]] = {}
+        for keyword in self.keywords:
+            self._by_first_char.setdefault(keyword[0], []).append(keyword)
+        self._candidates = (
+            re.compile(r'\b(?=' + _trie_pattern(self.keywords) + ')')
+            if self.keywords else None
+        )
+
+    @staticmethod
+    def _is_boundary(text: str, i: int) -> bool:
+        before = i > 0 and _is_word_char(text[i - 1])
+        after = i < len(text) and _is_word_char(text[i])
+        return before != after
+
+    def find(self, text: str) -> Dict[str, int]:
+        """Return ``{keyword: offset of its first match}``."""
+        found: Dict[str, int] = {}
+        if self._candidates is None:
+            return found
+
+        for candidate in self._candidates.finditer(text):
+            pos = candidate.start()
+            for keyword in self._by_first_char[text[pos]]:
+                if keyword in found or not text.startswith(keyword, pos):
+                    continue
+                end = pos + len(keyword)
+                if (
+                    (text.startswith('s', end) and self._is_boundary(text, end + 1))
+                    or self._is_boundary(text, end)
+                ):
+                    found[keyword] = pos
+        return found
+
+
+# Per-article outcome sent back from pool workers:
+# (is_relevant, score, primary_category, relevance_level, keywords, priorities)
+FilterFields = Tuple[bool, float, str, str, List[str], Dict[str, int]]
+
+_worker_filter: Optional['ContentFilter'] = None
+
+
+def _init_filter_worker(keywords_config: Dict[str, Any]) -> None:
+    """Build the worker's ContentFilter (and its matcher) once."""
+    global _worker_filter
+    _worker_filter = ContentFilter(keywords_config)
+
+
+def _filter_chunk(texts: List[Tuple[str, str, str]]) -> List[FilterFields]:
+    return [
+        _worker_filter._result_fields(_worker_filter.filter_article(
+            {'title': title, 'description': description, 'content': content}
+        ))
+        for title, description, content in texts
+    ]
+
+
 class ContentFilter:
-    def __init__(self, keywords_config: Dict[str, Any]):
+    # Bump when scoring rules change so cached results are invalidated.
+    SCORING_VERSION = 1
+
+    def __init__(
+        self,
+        keywords_config: Dict[str, Any],
+        cache: Optional[FilterCache] = None
+    ):
+        self.keywords_config = keywords_config
         self.high_priority_keywords: Set[str] = set(
             k.lower() for k in keywords_config.get('high_priority', [])
         )
@@ -43,15 +170,39 @@ class ContentFilter:
             self.event_keywords
         )
 
-    def _extract_context(self, text: str, keyword: str, context_length: int = 50) -> str:
-        text_lower = text.lower()
-        idx = text_lower.find(keyword)
-        if idx == -1:
-            return keyword
-        
-        start = max(0, idx - context_length)
-        end = min(len(text), idx + len(keyword) + context_length)
-        return '...' + text[start:end] + '...'
+        # (keywords in config order, category, priority), in the order
+        # matches are reported.
+        self._keyword_groups: List[Tuple[List[str], str, int]] = [
+            (self._ordered(keywords_config.get('high_priority', [])), 'education_family', 1),
+            (self._ordered(keywords_config.get('medium_priority', [])), 'activities_health', 2),
+            (self._ordered(keywords_config.get('event_keywords', [])), 'events', 2),
+        ]
+        self.matcher = KeywordMatcher(
+            keyword for keywords, _, _ in self._keyword_groups for keyword in keywords
+        )
+        self.section_classifier = SectionClassifier()
+
+        self.fingerprint = hashlib.sha1(
+            json.dumps([self.SCORING_VERSION, self._keyword_groups]).encode('utf-8')
+        ).hexdigest()
+        self.cache = cache
+        if cache is not None:
+            cache.use_fingerprint(self.fingerprint)
+
+    @staticmethod
+    def _ordered(keywords: List[str]) -> List[str]:
+        return list(dict.fromkeys(k.lower() for k in keywords))
+
+    def _extract_context(
+        self,
+        text: str,
+        keyword: str,
+        context_length: int = 50,
+        offset: Optional[int] = None
+    ) -> str:
+        if offset is None:
+            offset = text.lower().find(keyword)
+        return _extract_context(text, keyword, offset, context_length)
 
     def _calculate_score(self, matches: List[FilterMatch]) -> float:
         if not matches:
@@ -90,12 +241,18 @@ class ContentFilter:
         
         return max(category_counts, key=lambda k: category_counts[k])
 
-    def filter_article(self, article: Dict[str, Any]) -> FilterResult:
+    def _full_text(self, article: Dict[str, Any]) -> str:
         title = article.get('title', '').lower()
         description = article.get('description', '').lower()
         content = article.get('content', '').lower()
-        
-        full_text = f"{title} {description} {content}"
+        return f"{title} {description} {content}"
+
+    def _cache_key(self, article: Dict[str, Any]) -> str:
+        text = f"{self.fingerprint}\0{self._full_text(article)}"
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def filter_article(self, article: Dict[str, Any]) -> FilterResult:
+        full_text = self._full_text(article)
         
         if len(full_text.strip()) < 10:
             return FilterResult(
@@ -106,37 +263,21 @@ class ContentFilter:
                 relevance_level='none'
             )
         
+        found = self.matcher.find(full_text)
         matches: List[FilterMatch] = []
 
-        for keyword in self.high_priority_keywords:
-            pattern = r'\b' + re.escape(keyword) + r's?\b'
-            if re.search(pattern, full_text):
-                matches.append(FilterMatch(
-                    keyword=keyword,
-                    category='education_family',
-                    priority=1,
-                    context=self._extract_context(full_text, keyword)
-                ))
-
-        for keyword in self.medium_priority_keywords:
-            pattern = r'\b' + re.escape(keyword) + r's?\b'
-            if re.search(pattern, full_text):
-                matches.append(FilterMatch(
-                    keyword=keyword,
-                    category='activities_health',
-                    priority=2,
-                    context=self._extract_context(full_text, keyword)
-                ))
-
-        for keyword in self.event_keywords:
-            pattern = r'\b' + re.escape(keyword) + r's?\b'
-            if re.search(pattern, full_text):
-                matches.append(FilterMatch(
-                    keyword=keyword,
-                    category='events',
-                    priority=2,
-                    context=self._extract_context(full_text, keyword)
-                ))
+        if found:
+            for keywords, category, priority in self._keyword_groups:
+                for keyword in keywords:
+                    offset = found.get(keyword)
+                    if offset is not None:
+                        matches.append(FilterMatch(
+                            keyword=keyword,
+                            category=category,
+                            priority=priority,
+                            offset=offset,
+                            text=full_text
+                        ))
 
         score = self._calculate_score(matches)
         is_relevant = score > 0
@@ -151,18 +292,149 @@ class ContentFilter:
             relevance_level=relevance_level
         )
 
-    def filter_articles(self, articles: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    def _keyword_priorities(self, matches: List[FilterMatch]) -> Dict[str, int]:
+        priorities: Dict[str, int] = {}
+        for match in matches:
+            priorities[match.keyword] = min(priorities.get(match.keyword, match.priority), match.priority)
+        return priorities
+
+    def _result_fields(self, result: FilterResult) -> FilterFields:
+        return (
+            result.is_relevant,
+            result.score,
+            result.primary_category,
+            result.relevance_level,
+            [m.keyword for m in result.matches],
+            self._keyword_priorities(result.matches)
+        )
+
+    def _apply_fields(self, article: Dict[str, Any], fields: FilterFields) -> bool:
+        is_relevant, score, category, relevance_level, keywords, priorities = fields
+        if is_relevant:
+            article['filter_score'] = score
+            article['filter_category'] = category
+            article['relevance_level'] = relevance_level
+            article['matched_keywords'] = keywords
+            article['keyword_priorities'] = priorities
+            # Depends on source as well as text, so it is not cached.
+            article['section'] = self.section_classifier.classify(article)
+        return is_relevant
+
+    def _lookup_cached(
+        self,
+        chunk: List[Dict[str, Any]]
+    ) -> Tuple[List[str], Dict[int, FilterFields]]:
+        """Cache keys for ``chunk`` and the results already cached, by index."""
+        if self.cache is None:
+            return [], {}
+        keys = [self._cache_key(article) for article in chunk]
+        hits = self.cache.get_many(keys)
+        return keys, {
+            i: tuple(hits[key]) for i, key in enumerate(keys) if key in hits
+        }
+
+    def _merge_scored(
+        self,
+        chunk: List[Dict[str, Any]],
+        keys: List[str],
+        cached: Dict[int, FilterFields],
+        scored: List[FilterFields]
+    ) -> List[FilterFields]:
+        """Interleave fresh results with cached ones and cache the fresh ones."""
+        fresh = iter(scored)
+        fields: List[FilterFields] = []
+        new_entries: Dict[str, FilterFields] = {}
+        for i in range(len(chunk)):
+            if i in cached:
+                fields.append(cached[i])
+                continue
+            result = next(fresh)
+            fields.append(result)
+            if keys:
+                new_entries[keys[i]] = result
+        if new_entries:
+            self.cache.put_many(new_entries)
+        return fields
+
+    @staticmethod
+    def _chunks(articles: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+        chunk: List[Dict[str, Any]] = []
+        for article in articles:
+            chunk.append(article)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _score_chunks(
+        self,
+        articles: Iterable[Dict[str, Any]],
+        workers: int,
+        chunk_size: int
+    ) -> Iterator[Tuple[List[Dict[str, Any]], List[FilterFields]]]:
+        if workers <= 1:
+            for chunk in self._chunks(articles, chunk_size):
+                keys, cached = self._lookup_cached(chunk)
+                scored = [
+                    self._result_fields(self.filter_article(article))
+                    for i, article in enumerate(chunk) if i not in cached
+                ]
+                yield chunk, self._merge_scored(chunk, keys, cached, scored)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_filter_worker,
+            initargs=(self.keywords_config,)
+        ) as executor:
+            pending: deque = deque()
+            for chunk in self._chunks(articles, chunk_size):
+                keys, cached = self._lookup_cached(chunk)
+                texts = [
+                    (a.get('title', ''), a.get('description', ''), a.get('content', ''))
+                    for i, a in enumerate(chunk) if i not in cached
+                ]
+                pending.append((chunk, keys, cached, executor.submit(_filter_chunk, texts)))
+                if len(pending) >= 2 * workers:
+                    done_chunk, done_keys, done_cached, future = pending.popleft()
+                    yield done_chunk, self._merge_scored(done_chunk, done_keys, done_cached, future.result())
+
+            while pending:
+                done_chunk, done_keys, done_cached, future = pending.popleft()
+                yield done_chunk, self._merge_scored(done_chunk, done_keys, done_cached, future.result())
+
+    def iter_filter(
+        self,
+        articles: Iterable[Dict[str, Any]],
+        workers: int = 1,
+        chunk_size: int = 200
+    ) -> Iterator[Tuple[Dict[str, Any], bool]]:
+        """Yield ``(article, is_relevant)`` in input order.
+
+        Relevant articles are annotated as in ``filter_articles``. Articles
+        whose text was already scored under the current keyword config are
+        served from the FilterCache, if one is configured. With
+        ``workers > 1`` the rest are scored in chunks on a process pool;
+        each worker compiles the keyword config once, only the text fields
+        are sent over, and at most ``2 * workers`` chunks are in flight, so
+        arbitrarily long inputs stream in constant memory.
+        """
+        for chunk, fields in self._score_chunks(articles, workers, chunk_size):
+            for article, article_fields in zip(chunk, fields):
+                yield article, self._apply_fields(article, article_fields)
+
+    def filter_articles(
+        self,
+        articles: List[Dict[str, Any]],
+        workers: int = 1,
+        chunk_size: int = 200
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
         relevant_articles = []
         filtered_out = []
         
-        for article in articles:
-            result = self.filter_article(article)
-            
-            if result.is_relevant:
-                article['filter_score'] = result.score
-                article['filter_category'] = result.primary_category
-                article['relevance_level'] = result.relevance_level
-                article['matched_keywords'] = [m.keyword for m in result.matches]
+        for article, is_relevant in self.iter_filter(articles, workers, chunk_size):
+            if is_relevant:
                 relevant_articles.append(article)
             else:
                 filtered_out.append(article)
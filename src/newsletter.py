@@ -4,12 +4,18 @@ from typing import List, Dict, Any, Optional
 from string import Template
 import json
 
+from .clustering import StoryClusterer
+from .sections import SectionClassifier, SECTIONS, DEFAULT_SECTION
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class NewsletterGenerator:
-    def __init__(self):
+    def __init__(self, clusterer: Optional[StoryClusterer] = None, max_related: int = 3):
+        self.clusterer = clusterer or StoryClusterer()
+        self.max_related = max_related
+        self.section_classifier = SectionClassifier()
         self.newsletter_template = Template('''
 # Cleveland Parent News
 
@@ -89,43 +95,41 @@ ${news_section}
         if include_description and description:
             desc_preview = description[:150] + '...' if len(description) > 150 else description
             entry += f"\n{desc_preview}"
+
+        related = self._related_links(article)
+        if related:
+            entry += "\n*Related coverage:*"
+            for item in related:
+                entry += f"\n- [{item.get('title', 'Untitled')}]({item.get('url', '')}) ({item.get('source', 'Unknown')})"
         
         return entry
 
+    def _related_links(self, article: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Other coverage: recorded copies of the story, then grouped stories."""
+        links = list(article.get('duplicates', []))
+        for item in article.get('related', []):
+            links.append(item)
+            links.extend(item.get('duplicates', []))
+        return links[:self.max_related]
+
+    def _group_stories(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge articles about the same story into one entry with sub-links."""
+        return self.clusterer.cluster(articles)
+
     def _categorize_articles(self, articles: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
-        categories = {
-            'education': [],
-            'events': [],
-            'parks': [],
-            'library': [],
-            'health': [],
-            'news': []
-        }
+        categories: Dict[str, List[Dict[str, Any]]] = {section: [] for section in SECTIONS}
         
         for article in articles:
-            matched_keywords = [k.lower() for k in article.get('matched_keywords', [])]
-            filter_category = article.get('filter_category', '')
-            source = article.get('source', '').lower()
-            description = article.get('description', '').lower()
-            title = article.get('title', '').lower()
-            
-            all_text = f"{' '.join(matched_keywords)} {filter_category} {source} {description} {title}"
-            
-            if any(kw in all_text for kw in ['school', 'cmsd', 'education', 'teacher', 'student', 'classroom']):
-                categories['education'].append(article)
-            elif any(kw in all_text for kw in ['event', 'family fun', 'workshop', 'camp', 'storytime']):
-                categories['events'].append(article)
-            elif any(kw in all_text for kw in ['park', 'metroparks', 'zoo', 'playground', 'outdoor']):
-                categories['parks'].append(article)
-            elif any(kw in all_text for kw in ['library', 'reading', 'book', 'cpl']):
-                categories['library'].append(article)
-            elif any(kw in all_text for kw in ['health', 'safety', 'vaccination', 'hospital', 'clinic']):
-                categories['health'].append(article)
-            else:
-                categories['news'].append(article)
+            # Stored articles carry the section assigned at filtering time.
+            section = article.get('section') or self.section_classifier.classify(article)
+            categories.get(section, categories[DEFAULT_SECTION]).append(article)
         
+        # get_ranked_articles supplies a recency-decayed score; keep its order.
         for cat in categories:
-            categories[cat].sort(key=lambda x: x.get('filter_score', 0), reverse=True)
+            categories[cat].sort(
+                key=lambda x: x['decayed_score'] if x.get('decayed_score') is not None else x.get('filter_score', 0),
+                reverse=True
+            )
         
         return categories
 
@@ -143,8 +147,11 @@ ${news_section}
         self,
         articles: List[Dict[str, Any]],
         issue_number: int = 1,
-        max_items_per_section: int = 5
+        max_items_per_section: int = 5,
+        group_stories: bool = True
     ) -> str:
+        if group_stories:
+            articles = self._group_stories(articles)
         categories = self._categorize_articles(articles)
         
         newsletter = self.newsletter_template.substitute(
@@ -164,8 +171,12 @@ ${news_section}
     def generate_email_html(
         self,
         articles: List[Dict[str, Any]],
-        issue_number: int = 1
+        issue_number: int = 1,
+        group_stories: bool = True,
+        max_items_per_section: int = 5
     ) -> str:
+        if group_stories:
+            articles = self._group_stories(articles)
         categories = self._categorize_articles(articles)
         
         html_sections = []
@@ -180,12 +191,22 @@ ${news_section}
         ]
         
         for title, category in section_configs:
-            items = categories[category][:5]
+            items = categories[category][:max_items_per_section]
             if items:
                 section_html = f'''
                 <h2 style="color: #2c5282; border-bottom: 2px solid #4299e1; padding-bottom: 10px;">{title}</h2>
                 '''
                 for article in items:
+                    related_html = ''.join(
+                        f'''
+                            <li><a href="{item.get('url', '#')}" style="color: #2b6cb0;">{item.get('title', 'Untitled')}</a>
+                                <span style="color: #718096;">({item.get('source', 'Unknown')})</span></li>'''
+                        for item in self._related_links(article)
+                    )
+                    if related_html:
+                        related_html = f'''
+                        <ul style="margin: 8px 0 0 0; padding-left: 20px; font-size: 13px;">{related_html}
+                        </ul>'''
                     section_html += f'''
                     <div style="margin-bottom: 20px; padding: 15px; background-color: #f7fafc; border-radius: 8px;">
                         <h3 style="margin: 0 0 8px 0; color: #2d3748;">
@@ -198,7 +219,7 @@ ${news_section}
                         </p>
                         <p style="margin: 8px 0 0 0; color: #4a5568; font-size: 14px;">
                             {article.get('description', '')[:200]}{'...' if len(article.get('description', '')) > 200 else ''}
-                        </p>
+                        </p>{related_html}
                     </div>
                     '''
                 html_sections.append(section_html)
@@ -235,10 +256,16 @@ ${news_section}
     def generate_substack_post(
         self,
         articles: List[Dict[str, Any]],
-        issue_number: int = 1
+        issue_number: int = 1,
+        max_items_per_section: int = 5
     ) -> Dict[str, str]:
-        markdown = self.generate_newsletter(articles, issue_number)
-        html = self.generate_email_html(articles, issue_number)
+        articles = self._group_stories(articles)
+        markdown = self.generate_newsletter(
+            articles, issue_number, max_items_per_section, group_stories=False
+        )
+        html = self.generate_email_html(
+            articles, issue_number, group_stories=False, max_items_per_section=max_items_per_section
+        )
         
         title = f"Cleveland Parent News - Issue #{issue_number}"
         subtitle = f"Weekly roundup for Cleveland families - {datetime.now().strftime('%B %d, %Y')}"
@@ -253,22 +280,43 @@ ${news_section}
 
 def main():
     """Generate newsletter from database articles."""
-    from .database import ArticleDatabase
-    
-    db = ArticleDatabase()
-    
-    # Get recent articles from last 7 days
-    articles = db.get_articles(limit=30)
+    import yaml
+    from .dedup import NearDuplicateDetector
+    from .sharding import open_database, store_path
     
-    if not articles:
-        print("No articles found in database. Run 'uv run python -m src.collector' first.")
-        return
+    with open('config/sources.yaml', 'r') as f:
+        config = yaml.safe_load(f) or {}
+    settings = config.get('newsletter') or {}
+    items_per_section = settings.get('items_per_section', 5)
+    dedup_config = config.get('deduplication') or {}
     
-    # Get issue number from database
-    issue_number = db.get_collection_count() + 1
+    with open_database(config.get('database')) as db:
+        # Best unsent articles of each section from the recent window
+        articles = db.get_ranked_articles(
+            per_section=items_per_section,
+            window_days=settings.get('window_days', 7),
+            decay_days=settings.get('decay_days', 3)
+        )
+        
+        if not articles:
+            print("No articles found in database. Run 'uv run python -m src.collector' first.")
+            return
+        
+        NearDuplicateDetector(
+            db_path=store_path(db),
+            threshold=dedup_config.get('threshold', 0.6),
+            window_days=dedup_config.get('window_days', 14)
+        ).attach_duplicates(articles)
+        
+        # Get issue number from database
+        issue_number = db.get_collection_count() + 1
     
     generator = NewsletterGenerator()
-    post = generator.generate_substack_post(articles, issue_number=issue_number)
+    post = generator.generate_substack_post(
+        articles,
+        issue_number=issue_number,
+        max_items_per_section=items_per_section
+    )
     
     # Save outputs
     output_dir = 'data/processed'
@@ -0,0 +1,214 @@
+import re
+import json
+import logging
+from typing import List, Dict, Any, Set, Tuple, Optional, Iterator
+
+from .database import ArticleDatabase
+from .filters import ContentFilter
+from .scoring import HashedFeatureScorer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Keyword groups as stored: [[keywords, category, priority], ...]
+KeywordGroups = List[List[Any]]
+
+
+class KeywordRescorer:
+    """Re-score stored articles after ``parent_keywords`` changes.
+
+    The keyword config last applied to the database is kept as a setting.
+    A run diffs it against the current ContentFilter config and only
+    re-filters the articles that can be affected: those that matched a
+    removed or re-prioritised keyword (found through article_keywords) and
+    those whose text contains an added keyword (found through the
+    full-text index). Their scores, relevance levels and matched keywords
+    are recomputed and written back in bulk. With a ``scorer`` the
+    relevant ones get its score instead of the keyword score, as at
+    collection time.
+
+    Only articles that were relevant when collected are stored, so a new
+    keyword can raise existing articles but cannot bring back ones that
+    were filtered out at collection time.
+    """
+
+    SNAPSHOT_KEY = 'parent_keywords'
+
+    # Fields a re-score can change; articles where none changed are not written.
+    SCORING_FIELDS = (
+        'filter_score', 'filter_category', 'relevance_level',
+        'matched_keywords', 'keyword_priorities', 'section'
+    )
+
+    def __init__(
+        self,
+        database: ArticleDatabase,
+        content_filter: ContentFilter,
+        workers: int = 1,
+        batch_size: int = 500,
+        scorer: Optional[HashedFeatureScorer] = None
+    ):
+        self.database = database
+        self.content_filter = content_filter
+        self.scorer = scorer
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+
+    def _current_groups(self) -> KeywordGroups:
+        return [
+            [keywords, category, priority]
+            for keywords, category, priority in self.content_filter._keyword_groups
+        ]
+
+    def _load_snapshot(self) -> Optional[KeywordGroups]:
+        value = self.database.get_setting(self.SNAPSHOT_KEY)
+        return json.loads(value) if value else None
+
+    def _save_snapshot(self) -> None:
+        self.database.set_setting(self.SNAPSHOT_KEY, json.dumps(self._current_groups()))
+
+    @staticmethod
+    def _keyword_rules(groups: KeywordGroups) -> Dict[str, Set[Tuple[str, int]]]:
+        rules: Dict[str, Set[Tuple[str, int]]] = {}
+        for keywords, category, priority in groups:
+            for keyword in keywords:
+                rules.setdefault(keyword, set()).add((category, priority))
+        return rules
+
+    def diff(self, old_groups: KeywordGroups, new_groups: KeywordGroups) -> Tuple[Set[str], Set[str]]:
+        """Return ``(added, removed_or_changed)`` keywords."""
+        old_rules = self._keyword_rules(old_groups)
+        new_rules = self._keyword_rules(new_groups)
+        added = set(new_rules) - set(old_rules)
+        changed = {
+            keyword for keyword, rules in old_rules.items()
+            if new_rules.get(keyword) != rules
+        }
+        return added, changed
+
+    @staticmethod
+    def _phrase(keyword: str) -> str:
+        # Split on the same characters the unicode61 tokenizer does, so
+        # "kid-friendly" or "children's program" become phrase queries.
+        return '"' + ' '.join(re.findall(r'\w+', keyword)) + '"'
+
+    def affected_ids(self, added: Set[str], changed: Set[str]) -> Set[str]:
+        ids = set(self.database.get_article_ids_by_keywords(sorted(changed)))
+
+        phrases = [self._phrase(keyword) for keyword in sorted(added) if re.search(r'\w', keyword)]
+        # Keep each FTS query reasonably small.
+        for start in range(0, len(phrases), 50):
+            ids.update(self.database.match_article_ids(' OR '.join(phrases[start:start + 50])))
+
+        return ids
+
+    def _scoring_fields(self, article: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(
+            json.dumps(article.get(field), sort_keys=True) for field in self.SCORING_FIELDS
+        )
+
+    def _iter_candidates(self, article_ids: List[str]) -> Iterator[Dict[str, Any]]:
+        """Load candidates lazily, ``batch_size`` at a time.
+
+        Each article remembers its stored scoring fields so unchanged ones
+        can be left alone.
+        """
+        for start in range(0, len(article_ids), self.batch_size):
+            for article in self.database.load_articles(article_ids[start:start + self.batch_size]):
+                article['_stored_scoring'] = self._scoring_fields(article)
+                yield article
+
+    def _apply_scorer(
+        self,
+        results: Iterator[Tuple[Dict[str, Any], bool]]
+    ) -> Iterator[Tuple[Dict[str, Any], bool]]:
+        """Pass filter results through, re-scoring relevant ones a batch at a time."""
+        if self.scorer is None:
+            yield from results
+            return
+        chunk: List[Tuple[Dict[str, Any], bool]] = []
+        for result in results:
+            chunk.append(result)
+            if len(chunk) >= self.batch_size:
+                self.scorer.apply([article for article, is_relevant in chunk if is_relevant])
+                yield from chunk
+                chunk = []
+        self.scorer.apply([article for article, is_relevant in chunk if is_relevant])
+        yield from chunk
+
+    def _rescore(self, article_ids: List[str]) -> Tuple[int, int, int]:
+        """Re-filter ``article_ids`` in one stream; returns (updated, dropped, unchanged)."""
+        updated = dropped = unchanged = 0
+        pending: List[Dict[str, Any]] = []
+
+        def write() -> int:
+            result = self.database.bulk_insert_articles(pending, batch_size=self.batch_size)
+            pending.clear()
+            return result.inserted
+
+        # One iter_filter call, so a process pool is started once and kept
+        # busy across every batch.
+        for article, is_relevant in self._apply_scorer(self.content_filter.iter_filter(
+            self._iter_candidates(article_ids), workers=self.workers, chunk_size=self.batch_size
+        )):
+            if not is_relevant:
+                article['filter_score'] = 0.0
+                article['filter_category'] = 'general'
+                article['relevance_level'] = 'none'
+                article['matched_keywords'] = []
+                article['keyword_priorities'] = {}
+                article['section'] = self.content_filter.section_classifier.classify(article)
+
+            if self._scoring_fields(article) == article.pop('_stored_scoring'):
+                unchanged += 1
+                continue
+            if not is_relevant:
+                dropped += 1
+            pending.append(article)
+            if len(pending) >= self.batch_size:
+                updated += write()
+
+        if pending:
+            updated += write()
+        return updated, dropped, unchanged
+
+    def run(self, full: bool = False) -> Dict[str, int]:
+        """Re-score articles affected by keyword changes since the last run.
+
+        Without a stored snapshot (first run) or with ``full=True`` every
+        stored article is re-scored.
+        """
+        old_groups = self._load_snapshot()
+        if full or old_groups is None:
+            added, changed = set(), set()
+            article_ids = [record['id'] for record in self.database.iter_articles()]
+            logger.info(f"Re-scoring all {len(article_ids)} articles")
+        else:
+            added, changed = self.diff(old_groups, self._current_groups())
+            if not added and not changed:
+                logger.info("Keyword config unchanged; nothing to re-score")
+                return {
+                    'added': 0, 'changed': 0, 'candidates': 0,
+                    'updated': 0, 'dropped': 0, 'unchanged': 0
+                }
+            article_ids = sorted(self.affected_ids(added, changed))
+            logger.info(
+                f"{len(added)} keywords added, {len(changed)} removed or changed; "
+                f"re-scoring {len(article_ids)} candidate articles"
+            )
+
+        updated, dropped, unchanged = self._rescore(article_ids)
+
+        self._save_snapshot()
+        logger.info(
+            f"Re-scored articles: {updated} updated, {dropped} no longer relevant, "
+            f"{unchanged} unchanged"
+        )
+        return {
+            'added': len(added),
+            'changed': len(changed),
+            'candidates': len(article_ids),
+            'updated': updated,
+            'dropped': dropped,
+            'unchanged': unchanged
+        }
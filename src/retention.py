@@ -0,0 +1,139 @@
+import os
+import gzip
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+from .database import ArticleDatabase
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ArticleRetention:
+    """Archive and delete expired articles without long write locks.
+
+    Expired rows are handled in small batches: each batch is appended to a
+    gzipped JSONL file partitioned by collection date, deleted in its own
+    short transaction, and followed by an incremental vacuum so the
+    database file actually shrinks. Archived batches can be loaded back
+    with ``restore``.
+    """
+
+    def __init__(
+        self,
+        database: ArticleDatabase,
+        archive_dir: Optional[str] = 'data/archive',
+        batch_size: int = 500,
+        vacuum_pages: int = 2000
+    ):
+        self.database = database
+        self.archive_dir = archive_dir
+        self.batch_size = max(1, batch_size)
+        self.vacuum_pages = vacuum_pages
+
+    def _archive_path(self, collected_at: Optional[str]) -> str:
+        day = (collected_at or '')[:10] or 'undated'
+        if day == 'undated':
+            return os.path.join(self.archive_dir, 'undated', 'articles-undated.jsonl.gz')
+        year, month = day[:4], day[5:7]
+        return os.path.join(self.archive_dir, year, month, f'articles-{day}.jsonl.gz')
+
+    def _archive_batch(self, records: List[Dict[str, Any]]) -> None:
+        partitions: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            partitions.setdefault(self._archive_path(record.get('collected_at')), []).append(record)
+
+        for path, partition in partitions.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(path, 'at', encoding='utf-8') as f:
+                for record in partition:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+    def _load_batch(self, conn, rows) -> List[Dict[str, Any]]:
+        ids = [row['id'] for row in rows]
+        placeholders = ','.join('?' * len(ids))
+
+        contents = self.database.get_contents(ids)
+        priorities: Dict[str, Dict[str, Any]] = {}
+        for row in conn.execute(
+            f'SELECT article_id, keyword, priority FROM article_keywords WHERE article_id IN ({placeholders})',
+            ids
+        ):
+            priorities.setdefault(row[0], {})[row[1]] = row[2]
+
+        records = []
+        for row in rows:
+            record = dict(row)
+            record.pop('rowid', None)
+            record['type'] = record.pop('article_type', None)
+            record['content'] = contents.get(record['id'], '')
+            record['matched_keywords'] = json.loads(record['matched_keywords'] or '[]')
+            record['keyword_priorities'] = priorities.get(record['id'], {})
+            records.append(record)
+        return records
+
+    def ensure_incremental_vacuum(self) -> None:
+        """Switch the database to auto_vacuum=INCREMENTAL if it is not already.
+
+        Existing databases need a one-off VACUUM for the change to apply.
+        VACUUM may renumber articles' implicit rowids, so the full-text
+        index is rebuilt afterwards.
+        """
+        with self.database.get_connection() as conn:
+            mode = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+            if mode == 2:
+                return
+            logger.info("Enabling incremental vacuum (one-off VACUUM)...")
+            conn.commit()
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            conn.execute('VACUUM')
+            conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+            conn.commit()
+
+    def run(self, days: int = 30, sent_only: bool = True) -> int:
+        """Archive and delete articles collected more than ``days`` ago."""
+        self.ensure_incremental_vacuum()
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+
+        query = 'SELECT rowid, * FROM articles WHERE collected_at < ?'
+        if sent_only:
+            query += ' AND is_sent = 1'
+        query += ' ORDER BY collected_at LIMIT ?'
+
+        deleted = 0
+        with self.database.get_connection() as conn:
+            while True:
+                rows = conn.execute(query, (cutoff, self.batch_size)).fetchall()
+                if not rows:
+                    break
+
+                if self.archive_dir:
+                    self._archive_batch(self._load_batch(conn, rows))
+
+                conn.executemany(
+                    'DELETE FROM articles WHERE rowid = ?',
+                    [(row['rowid'],) for row in rows]
+                )
+                conn.commit()
+                deleted += len(rows)
+
+                conn.execute(f'PRAGMA incremental_vacuum({int(self.vacuum_pages)})').fetchall()
+
+        logger.info(f"Cleaned up {deleted} old articles")
+        return deleted
+
+    def restore(self, path: str) -> int:
+        """Load an archived JSONL(.gz) partition back into the database."""
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+        result = self.database.bulk_insert_articles(records)
+        sent = [record['id'] for record in records if record.get('is_sent')]
+        if sent:
+            self.database.mark_as_sent(sent)
+
+        logger.info(f"Restored {result.inserted} articles from {path}")
+        return result.inserted
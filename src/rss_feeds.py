@@ -1,46 +1,125 @@
 import feedparser
 import logging
+import threading
 import time
 import requests
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from datetime import datetime
+from urllib.parse import urlparse
 import hashlib
 
+from .fetch_cache import FetchCache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class HostRateLimiter:
+    """Per-host token buckets so unrelated hosts never wait on each other.
+
+    Each host gets a bucket refilled at ``max_requests_per_minute / 60``
+    tokens per second, plus a minimum ``min_delay`` between two requests to
+    the same host. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        min_delay: float = 1.0,
+        max_requests_per_minute: Optional[int] = None,
+        burst: int = 1
+    ):
+        self.min_delay = min_delay
+        self.rate = max_requests_per_minute / 60.0 if max_requests_per_minute else None
+        self.capacity = max(1, burst)
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Dict[str, float]] = {}
+
+    def acquire(self, host: str) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                bucket = self._buckets.setdefault(host, {
+                    'tokens': float(self.capacity),
+                    'updated': now,
+                    'last_request': float('-inf')
+                })
+
+                if self.rate:
+                    bucket['tokens'] = min(
+                        self.capacity,
+                        bucket['tokens'] + (now - bucket['updated']) * self.rate
+                    )
+                bucket['updated'] = now
+
+                wait = bucket['last_request'] + self.min_delay - now
+                if self.rate and bucket['tokens'] < 1:
+                    wait = max(wait, (1 - bucket['tokens']) / self.rate)
+
+                if wait <= 0:
+                    if self.rate:
+                        bucket['tokens'] -= 1
+                    bucket['last_request'] = now
+                    return
+
+            time.sleep(wait)
+
+
 class RSSFeedParser:
-    def __init__(self, rate_limit_delay: float = 1.0, timeout: int = 30):
+    def __init__(
+        self,
+        rate_limit_delay: float = 1.0,
+        timeout: int = 30,
+        max_requests_per_minute: Optional[int] = None,
+        max_workers: int = 5,
+        cache: Optional[FetchCache] = None,
+        incremental: bool = True
+    ):
         self.rate_limit_delay = rate_limit_delay
         self.timeout = timeout
-        self.last_request_time = 0
+        self.max_workers = max_workers
+        self.cache = cache
+        self.incremental = incremental
+        self.rate_limiter = HostRateLimiter(
+            min_delay=rate_limit_delay,
+            max_requests_per_minute=max_requests_per_minute
+        )
 
-    def _rate_limit(self):
-        current_time = time.time()
-        elapsed = current_time - self.last_request_time
-        if elapsed < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - elapsed)
-        self.last_request_time = time.time()
+    def _rate_limit(self, url: str):
+        self.rate_limiter.acquire(urlparse(url).netloc.lower())
 
     def _generate_article_id(self, url: str, title: str) -> str:
         content = f"{url}|{title}"
         return hashlib.md5(content.encode()).hexdigest()
 
-    def _fetch_feed_with_encoding(self, feed_url: str) -> bytes:
-        """Fetch feed with proper encoding handling."""
+    def _fetch_feed_with_encoding(
+        self,
+        feed_url: str,
+        conditional_headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[Optional[bytes], Dict[str, Optional[str]]]:
+        """Fetch feed with proper encoding handling.
+
+        Returns ``(None, validators)`` when the server answers 304 Not Modified.
+        """
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(feed_url, headers=headers, timeout=30)
+        headers.update(conditional_headers or {})
+        response = requests.get(feed_url, headers=headers, timeout=self.timeout)
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+        if response.status_code == 304:
+            return None, validators
         response.raise_for_status()
         
         # Try to detect encoding from response
         if response.encoding and response.encoding.lower() != 'utf-8':
             # Re-encode to ensure UTF-8
             content = response.content.decode(response.encoding, errors='replace').encode('utf-8')
-            return content
-        return response.content
+            return content, validators
+        return response.content, validators
 
     def parse_feed(self, feed_config: Dict[str, Any]) -> List[Dict[str, Any]]:
         articles = []
@@ -54,61 +133,147 @@ class RSSFeedParser:
             return articles
 
         try:
-            self._rate_limit()
+            self._rate_limit(feed_url)
             logger.info(f"Fetching RSS feed: {feed_name} - {feed_url}")
+
+            cached = self.cache.get_validators(feed_url) if self.cache else {}
+            validators: Dict[str, Optional[str]] = {}
             
-            # Use manual fetch for feeds with known encoding issues
+            # Use manual fetch for feeds with known encoding issues. A failed
+            # fetch is the feed's error: retrying directly would be a second
+            # request outside the host rate limit.
             if 'cleveland.com' in feed_url or 'wkyc.com' in feed_url:
-                try:
-                    feed_content = self._fetch_feed_with_encoding(feed_url)
-                    feed = feedparser.parse(feed_content)
-                except Exception as fetch_err:
-                    logger.warning(f"Manual fetch failed for {feed_name}, trying direct: {fetch_err}")
-                    feed = feedparser.parse(feed_url)
+                conditional = self.cache.conditional_headers(feed_url) if self.cache else {}
+                feed_content, validators = self._fetch_feed_with_encoding(feed_url, conditional)
+                if feed_content is None:
+                    logger.info(f"Feed not modified since last run: {feed_name}")
+                    return articles
+                feed = feedparser.parse(feed_content)
             else:
                 feed = feedparser.parse(
                     feed_url,
+                    etag=cached.get('etag'),
+                    modified=cached.get('last_modified'),
                     request_headers={'User-Agent': 'ClevelandParentNews/1.0'}
                 )
+                if feed.get('status') == 304:
+                    logger.info(f"Feed not modified since last run: {feed_name}")
+                    return articles
+                validators = {
+                    'etag': feed.get('etag'),
+                    'last_modified': feed.get('modified')
+                }
 
             if feed.bozo and feed.bozo_exception:
                 logger.warning(f"Feed parsing warning for {feed_name}: {feed.bozo_exception}")
 
+            watermark = None
+            if self.cache and self.incremental:
+                watermark = self.cache.get_watermark(feed_url)
+
+            collected_at = datetime.now().isoformat()
+            feed_guids: List[str] = []
+            newest_published = watermark['last_published'] if watermark else None
+            skipped = 0
+
+            # Seen entries are skipped one by one rather than ending the walk:
+            # feeds may list oldest first or pin an old entry at the top.
             for entry in feed.entries:
+                guid = self._entry_guid(entry)
+                published = self._entry_published(entry)
+                published_iso = published.isoformat() if published else None
+
+                if guid:
+                    feed_guids.append(guid)
+                if watermark and self._is_seen(guid, published_iso, watermark):
+                    skipped += 1
+                    continue
+
+                if published_iso and (newest_published is None or published_iso > newest_published):
+                    newest_published = published_iso
+
                 try:
-                    article = self._parse_entry(entry, feed_name, category, priority)
+                    article = self._parse_entry(
+                        entry, feed_name, category, priority,
+                        published=published, collected_at=collected_at
+                    )
                     if article:
                         articles.append(article)
                 except Exception as e:
                     logger.error(f"Error parsing entry in {feed_name}: {e}")
                     continue
 
+            if skipped:
+                logger.info(f"Skipped {skipped} already-seen entries in {feed_name}")
             logger.info(f"Parsed {len(articles)} articles from {feed_name}")
 
+            # Staged only; the collector commits them once the articles are stored.
+            if self.cache and validators:
+                self.cache.stage_validators(
+                    feed_url, validators.get('etag'), validators.get('last_modified')
+                )
+            if self.cache and self.incremental and (feed_guids or newest_published):
+                current = list(dict.fromkeys(feed_guids))
+                listed = set(current)
+                previous = [g for g in watermark['seen_guids'] if g not in listed] if watermark else []
+                self.cache.stage_watermark(feed_url, current + previous, newest_published)
+
         except Exception as e:
             logger.error(f"Error fetching feed {feed_name}: {e}")
 
         return articles
 
-    def _parse_entry(self, entry: Any, source: str, category: str, priority: int) -> Optional[Dict[str, Any]]:
-        title = entry.get('title', '')
-        if not title:
-            return None
+    def _entry_guid(self, entry: Any) -> Optional[str]:
+        return entry.get('id') or entry.get('link') or entry.get('title') or None
 
-        url = entry.get('link', '')
-        description = entry.get('description', entry.get('summary', ''))
-        
-        published = None
+    def _entry_published(self, entry: Any) -> Optional[datetime]:
         if hasattr(entry, 'published_parsed') and entry.published_parsed:
             try:
-                published = datetime(*entry.published_parsed[:6])
+                return datetime(*entry.published_parsed[:6])
             except (TypeError, ValueError):
-                pass
+                return None
         elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
             try:
-                published = datetime(*entry.updated_parsed[:6])
+                return datetime(*entry.updated_parsed[:6])
             except (TypeError, ValueError):
-                pass
+                return None
+        return None
+
+    def _is_seen(
+        self,
+        guid: Optional[str],
+        published: Optional[str],
+        watermark: Dict[str, Any]
+    ) -> bool:
+        """Whether an entry was collected by an earlier run.
+
+        Entries are recognised by GUID. Only entries without one fall back
+        to the published timestamp of the newest entry seen so far.
+        """
+        if guid:
+            return guid in watermark['seen_guids']
+        if published and watermark['last_published']:
+            return published <= watermark['last_published']
+        return False
+
+    def _parse_entry(
+        self,
+        entry: Any,
+        source: str,
+        category: str,
+        priority: int,
+        published: Optional[datetime] = None,
+        collected_at: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        title = entry.get('title', '')
+        if not title:
+            return None
+
+        url = entry.get('link', '')
+        description = entry.get('description', entry.get('summary', ''))
+        
+        if not published:
+            published = self._entry_published(entry)
 
         if not published:
             published = datetime.now()
@@ -129,15 +294,37 @@ class RSSFeedParser:
             'category': category,
             'priority': priority,
             'published_at': published.isoformat() if published else None,
-            'collected_at': datetime.now().isoformat(),
+            'collected_at': collected_at or datetime.now().isoformat(),
             'type': 'rss'
         }
 
-    def parse_all_feeds(self, feeds: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def parse_all_feeds(
+        self,
+        feeds: List[Dict[str, Any]],
+        on_feed: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Fetch all feeds concurrently, returning articles in config order.
+
+        Feeds on different hosts run in parallel; requests to the same host
+        are still spaced out by the per-host rate limiter. ``on_feed`` is
+        called with each feed's articles, in config order, as soon as that
+        feed is done, while the remaining feeds are still being fetched.
+        """
         all_articles = []
-        for feed_config in feeds:
-            articles = self.parse_feed(feed_config)
-            all_articles.extend(articles)
+        if self.max_workers <= 1 or len(feeds) <= 1:
+            for feed_config in feeds:
+                articles = self.parse_feed(feed_config)
+                all_articles.extend(articles)
+                if on_feed:
+                    on_feed(articles)
+            return all_articles
+
+        workers = min(self.max_workers, len(feeds))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rss') as executor:
+            for articles in executor.map(self.parse_feed, feeds):
+                all_articles.extend(articles)
+                if on_feed:
+                    on_feed(articles)
         return all_articles
 
 
@@ -0,0 +1,272 @@
+"""Hashed bag-of-words / bigram relevance scorer for large batches.
+
+Each article's title and description (optionally its content) are
+tokenized into unigrams and adjacent-word bigrams, hashed into a fixed
+number of feature buckets, and scored against a weight vector with a single
+sparse matrix-vector product over the whole batch.
+
+Without weights the scorer falls back to ContentFilter's keyword score.
+
+It is selected with the ``scoring`` section of the config (``mode: hashed``).
+The keyword filter still decides which articles are kept and their relevance
+level; the scorer then replaces the ``filter_score`` of kept articles with
+its output mapped onto the keyword score range.
+
+Weight files are either a ``.npy`` vector with one weight per bucket, or a
+``.json`` file::
+
+    {"n_features": 262144, "bias": 0.0, "weights": {"school": 3.0, "high school": 1.5}}
+"""
+import re
+import json
+import zlib
+import logging
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .filters import ContentFilter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Multiplier used to combine two unigram hashes into a bigram hash.
+BIGRAM_MULTIPLIER = 0x9E3779B1
+
+# Applied scores fall in (0, SCORE_SCALE): twice the keyword score of a
+# high-relevance article, with a margin of 0 in the middle.
+SCORE_SCALE = 10.0
+
+
+def _token_hash(token: str) -> int:
+    return zlib.crc32(token.encode('utf-8'))
+
+
+def _bigram_hash(first: int, second: int) -> int:
+    return (first * BIGRAM_MULTIPLIER + second) & 0xFFFFFFFFFFFFFFFF
+
+
+class HashedFeatureScorer:
+    """Batch relevance scorer over hashed unigram and bigram features.
+
+    ``score_batch`` returns one score per article, in order. Scores are
+    ``bias + sum(weights of the article's features) / sqrt(feature count)``
+    so long articles are not favoured just for being long.
+    """
+
+    def __init__(
+        self,
+        weights_path: Optional[str] = None,
+        n_features: int = 2 ** 18,
+        include_content: bool = False,
+        fallback: Optional[ContentFilter] = None
+    ):
+        if n_features <= 0 or n_features & (n_features - 1):
+            raise ValueError('n_features must be a power of two')
+        self.n_features = n_features
+        self.include_content = include_content
+        self.fallback = fallback
+        self.bias = 0.0
+        self.weights = None
+        self._token_hashes: Dict[str, int] = {}
+
+        if weights_path:
+            self.load_weights(weights_path)
+
+    @classmethod
+    def from_keyword_config(
+        cls,
+        keywords_config: Dict[str, Any],
+        **kwargs: Any
+    ) -> 'HashedFeatureScorer':
+        """Seed weights from parent_keywords, mirroring the keyword scorer.
+
+        Single-word keywords weigh 3.0 (high priority) or 1.5; multi-word
+        keywords are spread over their bigrams.
+        """
+        scorer = cls(fallback=ContentFilter(keywords_config), **kwargs)
+
+        features: Dict[str, float] = {}
+        for group, weight in (('high_priority', 3.0), ('medium_priority', 1.5), ('event_keywords', 1.5)):
+            for keyword in keywords_config.get(group, []):
+                tokens = TOKEN_PATTERN.findall(keyword.lower())
+                grams = tokens if len(tokens) == 1 else [
+                    f'{a} {b}' for a, b in zip(tokens, tokens[1:])
+                ]
+                for gram in grams:
+                    features[gram] = max(features.get(gram, 0.0), weight / len(grams))
+                if len(tokens) == 1:
+                    plural = tokens[0] + 's'
+                    features[plural] = max(features.get(plural, 0.0), weight)
+        scorer.set_weights(features)
+        return scorer
+
+    @property
+    def vectorized(self) -> bool:
+        return self.weights is not None
+
+    def feature_index(self, feature: str) -> int:
+        """Bucket of a unigram (``"school"``) or bigram (``"high school"``)."""
+        tokens = TOKEN_PATTERN.findall(feature.lower())
+        if len(tokens) == 1:
+            value = _token_hash(tokens[0])
+        elif len(tokens) == 2:
+            value = _bigram_hash(_token_hash(tokens[0]), _token_hash(tokens[1]))
+        else:
+            raise ValueError(f'Features are one or two words: {feature!r}')
+        return value & (self.n_features - 1)
+
+    def set_weights(self, features: Dict[str, float], bias: float = 0.0) -> None:
+        self.weights = np.zeros(self.n_features, dtype=np.float64)
+        for feature, weight in features.items():
+            self.weights[self.feature_index(feature)] += weight
+        self.bias = bias
+
+    def load_weights(self, path: str) -> None:
+        if path.endswith('.npy'):
+            weights = np.load(path)
+            if weights.ndim != 1 or len(weights) & (len(weights) - 1):
+                raise ValueError(f'{path}: expected a 1-d vector with a power-of-two length')
+            self.n_features = len(weights)
+            self.weights = weights.astype(np.float64, copy=False)
+            self.bias = 0.0
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            n_features = int(data.get('n_features', self.n_features))
+            if n_features <= 0 or n_features & (n_features - 1):
+                raise ValueError(f'{path}: n_features must be a power of two')
+            self.n_features = n_features
+            self.set_weights(data.get('weights', {}), bias=float(data.get('bias', 0.0)))
+        logger.info(f"Loaded {self.n_features} feature weights from {path}")
+
+    def _text(self, article: Dict[str, Any]) -> str:
+        parts = [article.get('title') or '', article.get('description') or '']
+        if self.include_content:
+            parts.append(article.get('content') or '')
+        return ' '.join(parts).lower()
+
+    def vectorize(self, articles: Sequence[Dict[str, Any]]) -> Tuple[Any, Any]:
+        """Hash ``articles`` into ``(row_ids, feature_indices)`` arrays.
+
+        Together they form the sparse article x feature count matrix in
+        coordinate form. Token hashes are memoized, and bigram hashes are
+        derived from them with array arithmetic.
+        """
+        hashes = self._token_hashes
+        token_hashes: List[int] = []
+        lengths: List[int] = []
+        for article in articles:
+            tokens = TOKEN_PATTERN.findall(self._text(article))
+            for token in tokens:
+                value = hashes.get(token)
+                if value is None:
+                    value = hashes[token] = _token_hash(token)
+                token_hashes.append(value)
+            lengths.append(len(tokens))
+
+        unigrams = np.array(token_hashes, dtype=np.uint64)
+        counts = np.array(lengths, dtype=np.int64)
+        rows = np.repeat(np.arange(len(articles), dtype=np.int64), counts)
+
+        # A bigram joins token i and i + 1 unless token i ends its article.
+        same_article = rows[:-1] == rows[1:]
+        bigrams = (unigrams[:-1] * np.uint64(BIGRAM_MULTIPLIER) + unigrams[1:])[same_article]
+
+        mask = np.uint64(self.n_features - 1)
+        features = np.concatenate([unigrams & mask, bigrams & mask]).astype(np.int64)
+        row_ids = np.concatenate([rows, rows[:-1][same_article]])
+        return row_ids, features
+
+    def score_vectors(self, row_ids: Any, features: Any, n_articles: int) -> Any:
+        """One sparse matrix-vector product: per-article weighted feature sums."""
+        totals = np.bincount(row_ids, weights=self.weights[features], minlength=n_articles)
+        sizes = np.bincount(row_ids, minlength=n_articles)
+        return self.bias + totals / np.sqrt(np.maximum(sizes, 1))
+
+    def score_batch(self, articles: Sequence[Dict[str, Any]]) -> Sequence[float]:
+        """Score ``articles``; a NumPy array when vectorized, else a list."""
+        if not self.vectorized:
+            if self.fallback is None:
+                raise RuntimeError('No weights loaded and no fallback ContentFilter')
+            return [self.fallback.filter_article(article).score for article in articles]
+
+        if not articles:
+            return np.zeros(0)
+        row_ids, features = self.vectorize(articles)
+        return self.score_vectors(row_ids, features, len(articles))
+
+    def apply(self, articles: Sequence[Dict[str, Any]]) -> None:
+        """Replace the ``filter_score`` of kept articles, in place.
+
+        Margins are squashed with a logistic into (0, SCORE_SCALE), so a
+        kept article never drops to a score of zero or below, where the
+        ranking query would leave it out. Without weights the keyword
+        scores are left as they are.
+        """
+        if not self.vectorized or not articles:
+            return
+        margins = np.clip(self.score_batch(articles), -50.0, 50.0)
+        scores = SCORE_SCALE / (1.0 + np.exp(-margins))
+        for article, score in zip(articles, scores):
+            article['filter_score'] = max(round(float(score), 2), 0.01)
+
+    def rank(self, articles: Sequence[Dict[str, Any]], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Articles sorted by descending score."""
+        scores = self.score_batch(articles)
+        order = sorted(range(len(articles)), key=lambda i: scores[i], reverse=True)
+        return [articles[i] for i in order[:limit]]
+
+
+def build_scorer(config: Dict[str, Any]) -> Optional[HashedFeatureScorer]:
+    """Scorer selected by the ``scoring`` config section, or None for keyword scores."""
+    settings = config.get('scoring') or {}
+    mode = settings.get('mode', 'keyword')
+    if mode == 'keyword':
+        return None
+    if mode != 'hashed':
+        raise ValueError(f"Unknown scoring mode: {mode!r}")
+
+    options = {'include_content': settings.get('include_content', False)}
+    keywords_config = config.get('parent_keywords', {})
+    if settings.get('weights_path'):
+        scorer = HashedFeatureScorer(
+            weights_path=settings['weights_path'],
+            fallback=ContentFilter(keywords_config),
+            **options
+        )
+    else:
+        scorer = HashedFeatureScorer.from_keyword_config(keywords_config, **options)
+    logger.info(f"Scoring relevant articles with hashed features ({scorer.n_features} buckets)")
+    return scorer
+
+
+def main():
+    import time
+    import yaml
+
+    with open('config/sources.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    scorer = HashedFeatureScorer.from_keyword_config(config.get('parent_keywords', {}))
+
+    articles = [
+        {'title': 'CMSD announces new high school schedule', 'description': 'Students and parents react'},
+        {'title': 'Metroparks family fun day', 'description': 'Free storytime and crafts for kids'},
+        {'title': 'Local restaurant opens downtown', 'description': 'Popular dining spot expands'},
+    ] * 33334
+
+    start = time.time()
+    scores = scorer.score_batch(articles)
+    elapsed = time.time() - start
+
+    print(f"\nScored {len(articles)} articles in {elapsed:.3f}s "
+          f"({'vectorized' if scorer.vectorized else 'keyword fallback'})")
+    for article, score in zip(articles[:3], scores[:3]):
+        print(f"- {score:.2f} {article['title']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,14 +7,22 @@ from datetime import datetime
 import hashlib
 import re
 
+from .fetch_cache import FetchCache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class WebScraper:
-    def __init__(self, rate_limit_delay: float = 1.0, timeout: int = 30):
+    def __init__(
+        self,
+        rate_limit_delay: float = 1.0,
+        timeout: int = 30,
+        cache: Optional[FetchCache] = None
+    ):
         self.rate_limit_delay = rate_limit_delay
         self.timeout = timeout
+        self.cache = cache
         self.last_request_time = 0
         self.session = requests.Session()
         self.session.headers.update({
@@ -45,10 +53,23 @@ class WebScraper:
             self._rate_limit()
             logger.info(f"Fetching page: {url}")
             
-            response = self.session.get(url, timeout=self.timeout)
+            headers = self.cache.conditional_headers(url) if self.cache else {}
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                logger.info(f"Page not modified since last run: {url}")
+                return None
             response.raise_for_status()
             
-            return BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(response.content, 'html.parser')
+
+            if self.cache:
+                self.cache.stage_validators(
+                    url,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified')
+                )
+
+            return soup
         
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching {url}: {e}")
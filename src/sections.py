@@ -0,0 +1,66 @@
+import re
+import json
+from typing import List, Dict, Any, Tuple
+
+# Newsletter sections in priority order: an article goes to the first
+# section with a matching term. Terms match anywhere in the text, so
+# "park" also covers "parks" and "parking".
+SECTION_TERMS: List[Tuple[str, List[str]]] = [
+    ('education', ['school', 'cmsd', 'education', 'teacher', 'student', 'classroom']),
+    ('events', ['event', 'family fun', 'workshop', 'camp', 'storytime']),
+    ('parks', ['park', 'metroparks', 'zoo', 'playground', 'outdoor']),
+    ('library', ['library', 'reading', 'book', 'cpl']),
+    ('health', ['health', 'safety', 'vaccination', 'hospital', 'clinic']),
+]
+
+DEFAULT_SECTION = 'news'
+
+SECTIONS = [name for name, _ in SECTION_TERMS] + [DEFAULT_SECTION]
+
+
+class SectionClassifier:
+    """Assign an article to its newsletter section in one regex scan.
+
+    All section terms are compiled into a single lookahead alternation,
+    ordered by section priority, so one pass over the text finds every
+    term occurrence (overlapping ones included). The scan stops as soon
+    as a term of the first section is seen.
+    """
+
+    def __init__(self, section_terms: List[Tuple[str, List[str]]] = SECTION_TERMS):
+        self.rank: Dict[str, int] = {}
+        self.section_of: Dict[str, str] = {}
+        terms: List[str] = []
+        for rank, (section, section_keywords) in enumerate(section_terms):
+            self.rank[section] = rank
+            for term in section_keywords:
+                if term not in self.section_of:
+                    self.section_of[term] = section
+                    terms.append(term)
+        self.pattern = re.compile('(?=(' + '|'.join(map(re.escape, terms)) + '))')
+
+    @staticmethod
+    def section_text(article: Dict[str, Any]) -> str:
+        keywords = article.get('matched_keywords') or []
+        if isinstance(keywords, str):
+            keywords = json.loads(keywords or '[]')
+        return ' '.join([
+            ' '.join(k.lower() for k in keywords),
+            (article.get('filter_category') or '').lower(),
+            (article.get('source') or '').lower(),
+            (article.get('description') or '').lower(),
+            (article.get('title') or '').lower(),
+        ])
+
+    def classify_text(self, text: str) -> str:
+        best = None
+        for match in self.pattern.finditer(text):
+            section = self.section_of[match.group(1)]
+            if best is None or self.rank[section] < self.rank[best]:
+                best = section
+                if self.rank[best] == 0:
+                    break
+        return best or DEFAULT_SECTION
+
+    def classify(self, article: Dict[str, Any]) -> str:
+        return self.classify_text(self.section_text(article))
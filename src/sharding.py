@@ -0,0 +1,643 @@
+import os
+import re
+import json
+import sqlite3
+import logging
+import threading
+from functools import partial
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Callable
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+from urllib.parse import quote
+
+from .database import ArticleDatabase, ArticleRecord, BulkInsertResult, _inflate_content
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SHARD_FILE_PATTERN = re.compile(r'^articles-(\d{4}-\d{2})\.db$')
+
+ARTICLE_ORDER = 'filter_score DESC, collected_at DESC, id DESC'
+
+
+def _month_of(timestamp: Optional[str]) -> str:
+    return (timestamp or datetime.now().isoformat())[:7]
+
+
+def _previous_month(month: str) -> str:
+    first = datetime.strptime(month, '%Y-%m')
+    return (first - timedelta(days=1)).strftime('%Y-%m')
+
+
+def _in_wal_mode(path: str) -> bool:
+    # Bytes 18-19 of the database header are the read/write format
+    # versions, 2 for WAL. Checking them does not create -wal/-shm files.
+    with open(path, 'rb') as f:
+        header = f.read(20)
+    return len(header) == 20 and header[18] == 2
+
+
+def _article_key(article) -> Tuple[float, str, str]:
+    return (article['filter_score'] or 0, article['collected_at'] or '', article['id'])
+
+
+class ShardedArticleDatabase:
+    """Articles split into one SQLite file per collection month.
+
+    Each shard (``articles-YYYY-MM.db`` under ``shard_dir``) is a regular
+    ArticleDatabase; new articles go to the shard for their ``collected_at``
+    month. Reads ATTACH only the shards that can match — a ``since`` filter
+    skips every older month — and run a single UNION ALL query across them.
+    Shards older than the previous month are frozen: checkpointed out of WAL
+    mode and attached read-only with mmap, so they are never written by
+    normal collection. Only retention and schema migration open a frozen
+    shard for writing, and they keep its rollback journal. Collection runs
+    are kept in a small catalog database.
+    """
+
+    # SQLite's default SQLITE_MAX_ATTACHED is 10; more shards are queried
+    # in groups and merged.
+    MAX_ATTACHED = 8
+
+    def __init__(
+        self,
+        shard_dir: str = 'data/shards',
+        catalog_path: Optional[str] = None,
+        mmap_size: int = 256 * 1024 * 1024
+    ):
+        self.shard_dir = shard_dir
+        self.mmap_size = mmap_size
+        os.makedirs(shard_dir, exist_ok=True)
+
+        self.catalog = ArticleDatabase(catalog_path or os.path.join(shard_dir, 'catalog.db'))
+        self._shards: Dict[str, ArticleDatabase] = {}
+        self._lock = threading.Lock()
+        self._migrate_shards()
+
+    def _shard_path(self, month: str) -> str:
+        return os.path.join(self.shard_dir, f'articles-{month}.db')
+
+    def shard_months(self, since: Optional[str] = None) -> List[str]:
+        """Existing shard months in ascending order, pruned to ``since``."""
+        months = sorted(
+            match.group(1)
+            for match in map(SHARD_FILE_PATTERN.match, os.listdir(self.shard_dir))
+            if match
+        )
+        if since:
+            months = [month for month in months if month >= since[:7]]
+        return months
+
+    def is_frozen(self, month: str) -> bool:
+        return month < _previous_month(_month_of(None))
+
+    def _open_shard(self, month: str) -> ArticleDatabase:
+        return ArticleDatabase(
+            self._shard_path(month),
+            mmap_size=self.mmap_size,
+            wal=not self.is_frozen(month)
+        )
+
+    def shard(self, month: str) -> ArticleDatabase:
+        """Open (creating if needed) the writable shard for ``month``."""
+        created = False
+        with self._lock:
+            db = self._shards.get(month)
+            if db is None:
+                created = not os.path.exists(self._shard_path(month))
+                db = self._open_shard(month)
+                self._shards[month] = db
+                if created:
+                    logger.info(f"Created shard {month}")
+        if created and not self.is_frozen(month):
+            self.freeze_old_shards()
+        return db
+
+    def _migrate_shards(self) -> None:
+        """Bring shards written by older versions up to the current schema.
+
+        Every shard is queried with one UNION ALL, so they must all have
+        the same columns. Outdated shards are opened once as an
+        ArticleDatabase, which migrates them; frozen ones keep their
+        rollback journal.
+        """
+        with self.catalog.get_connection() as conn:
+            expected = {row[1] for row in conn.execute('PRAGMA table_info(articles)')}
+
+        outdated = []
+        for month in self.shard_months():
+            with self._attached([month]) as (conn, _):
+                columns = {row[1] for row in conn.execute('PRAGMA s0.table_info(articles)')}
+            if expected - columns:
+                outdated.append(month)
+
+        for month in outdated:
+            self._open_shard(month).close()
+            logger.info(f"Migrated shard {month}")
+        if outdated:
+            self.freeze_old_shards()
+
+    def freeze_old_shards(self) -> None:
+        """Checkpoint frozen shards and move them out of WAL mode.
+
+        A shard in rollback-journal mode can be attached with ``mode=ro``
+        and memory-mapped without any write access. Shards currently open
+        for writing are left alone until ``close``.
+        """
+        for month in self.shard_months():
+            if not self.is_frozen(month) or month in self._shards:
+                continue
+            path = self._shard_path(month)
+            if not _in_wal_mode(path):
+                continue
+            conn = sqlite3.connect(path)
+            try:
+                conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                conn.execute('PRAGMA journal_mode=DELETE')
+            finally:
+                conn.close()
+            logger.info(f"Froze shard {month}")
+
+    @contextmanager
+    def _attached(self, months: List[str], read_only: bool = True):
+        """Yield a connection with ``months`` attached as s0, s1, ..."""
+        conn = sqlite3.connect('file::memory:', uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.create_function('inflate_content', 1, _inflate_content, deterministic=True)
+        try:
+            aliases = []
+            for i, month in enumerate(months):
+                alias = f's{i}'
+                uri = 'file:' + quote(os.path.abspath(self._shard_path(month)))
+                if read_only:
+                    uri += '?mode=ro'
+                conn.execute(f'ATTACH DATABASE ? AS {alias}', (uri,))
+                conn.execute(f'PRAGMA {alias}.mmap_size={int(self.mmap_size)}')
+                aliases.append((alias, month))
+            yield conn, aliases
+            if conn.in_transaction:
+                conn.commit()
+        finally:
+            conn.close()
+
+    def _query_shards(
+        self,
+        months: List[str],
+        build: Callable[[str], Tuple[str, List[Any]]],
+        order_by: str,
+        limit: int,
+        key: Callable[[Any], Any],
+        reverse: bool = False
+    ) -> List[sqlite3.Row]:
+        """Run ``build(alias)`` on every shard and merge with one ORDER BY.
+
+        Each row gets a ``shard`` column naming the month it came from.
+        """
+        rows: List[sqlite3.Row] = []
+        for start in range(0, len(months), self.MAX_ATTACHED):
+            group = months[start:start + self.MAX_ATTACHED]
+            with self._attached(group) as (conn, aliases):
+                parts, params = [], []
+                for alias, month in aliases:
+                    query, query_params = build(alias)
+                    parts.append(f"SELECT *, '{month}' AS shard FROM ({query})")
+                    params.extend(query_params)
+                query = ' UNION ALL '.join(parts) + f' ORDER BY {order_by} LIMIT ?'
+                rows.extend(conn.execute(query, params + [limit]).fetchall())
+
+        if len(months) > self.MAX_ATTACHED:
+            rows = sorted(rows, key=key, reverse=reverse)[:limit]
+        return rows
+
+    def _route(self, articles: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Group articles by target shard.
+
+        Articles already stored in the previous month's shard stay there,
+        so a story seen again after a month boundary is updated rather than
+        duplicated.
+        """
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for article in articles:
+            by_month.setdefault(_month_of(article.get('collected_at')), []).append(article)
+
+        for month in list(by_month):
+            previous = _previous_month(month)
+            if not os.path.exists(self._shard_path(previous)) or self.is_frozen(previous):
+                continue
+            ids = [article['id'] for article in by_month[month]]
+            existing = set()
+            with self.shard(previous).get_connection() as conn:
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    existing.update(row[0] for row in conn.execute(
+                        f'SELECT id FROM articles WHERE id IN ({placeholders})', chunk
+                    ))
+            if existing:
+                by_month.setdefault(previous, []).extend(
+                    a for a in by_month[month] if a['id'] in existing
+                )
+                by_month[month] = [a for a in by_month[month] if a['id'] not in existing]
+
+        return {month: batch for month, batch in by_month.items() if batch}
+
+    def insert_article(self, article: Dict[str, Any]) -> bool:
+        return self.bulk_insert_articles([article]).inserted == 1
+
+    def insert_articles(self, articles: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        return self.bulk_insert_articles(articles, batch_size=batch_size).inserted
+
+    def bulk_insert_articles(
+        self,
+        articles: List[Dict[str, Any]],
+        batch_size: int = 500
+    ) -> BulkInsertResult:
+        result = BulkInsertResult()
+        for month, batch in sorted(self._route(articles).items()):
+            shard_result = self.shard(month).bulk_insert_articles(batch, batch_size=batch_size)
+            result.inserted += shard_result.inserted
+            result.unchanged += shard_result.unchanged
+            result.errors.extend(shard_result.errors)
+        return result
+
+    def _row_to_article(self, row: sqlite3.Row) -> Dict[str, Any]:
+        article = dict(row)
+        article['matched_keywords'] = json.loads(article['matched_keywords'] or '[]')
+        return article
+
+    def get_articles(
+        self,
+        limit: int = 100,
+        relevance_level: Optional[str] = None,
+        source: Optional[str] = None,
+        since: Optional[str] = None,
+        unprocessed_only: bool = False,
+        include_content: bool = False,
+        section: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        months = self.shard_months(since)
+        rows = self._query_shards(
+            months,
+            lambda alias: self.catalog._build_articles_query(
+                limit, relevance_level, source, since, unprocessed_only,
+                table=f'{alias}.articles', section=section
+            ),
+            ARTICLE_ORDER, limit, key=_article_key, reverse=True
+        )
+        articles = [self._row_to_article(row) for row in rows]
+
+        if include_content:
+            self._attach_contents(articles)
+
+        return articles
+
+    def get_ranked_articles(
+        self,
+        per_section: int = 5,
+        window_days: int = 7,
+        decay_days: float = 3.0,
+        now: Optional[datetime] = None,
+        include_content: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Per-section top articles, ranked across every shard in the window."""
+        now = now or datetime.now()
+        since = (now - timedelta(days=window_days)).isoformat()
+        months = self.shard_months(since)
+
+        rows: List[sqlite3.Row] = []
+        for start in range(0, len(months), self.MAX_ATTACHED):
+            with self._attached(months[start:start + self.MAX_ATTACHED]) as (conn, aliases):
+                query, params = self.catalog._build_ranked_query(
+                    per_section, since, now.isoformat(), decay_days,
+                    tables=[f'{alias}.articles' for alias, _ in aliases],
+                    shard_labels=[month for _, month in aliases]
+                )
+                rows.extend(conn.execute(query, params).fetchall())
+
+        articles = [self._row_to_article(row) for row in rows]
+        if len(months) > self.MAX_ATTACHED:
+            # Each group was ranked on its own; re-rank the union.
+            articles.sort(key=lambda a: (a['decayed_score'], a['collected_at'] or '', a['id']), reverse=True)
+            articles.sort(key=lambda a: a['section'] or '')
+            ranked: List[Dict[str, Any]] = []
+            for article in articles:
+                if ranked and ranked[-1]['section'] == article['section']:
+                    article['section_rank'] = ranked[-1]['section_rank'] + 1
+                else:
+                    article['section_rank'] = 1
+                ranked.append(article)
+            articles = [a for a in ranked if a['section_rank'] <= per_section]
+
+        if include_content:
+            self._attach_contents(articles)
+
+        return articles
+
+    def _attach_contents(self, articles: List[Dict[str, Any]]) -> None:
+        by_month: Dict[str, List[str]] = {}
+        for article in articles:
+            by_month.setdefault(article['shard'], []).append(article['id'])
+        contents: Dict[str, str] = {}
+        for month, ids in by_month.items():
+            contents.update(self._get_contents(month, ids))
+        for article in articles:
+            article['content'] = contents.get(article['id'], '')
+
+    def _get_contents(self, month: str, article_ids: List[str]) -> Dict[str, str]:
+        contents: Dict[str, str] = {}
+        with self._attached([month]) as (conn, _):
+            for start in range(0, len(article_ids), 500):
+                chunk = article_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for row in conn.execute(
+                    f'SELECT article_id, body FROM s0.article_content WHERE article_id IN ({placeholders})',
+                    chunk
+                ):
+                    contents[row[0]] = _inflate_content(row[1])
+        return contents
+
+    def _get_content(self, month: str, article_id: str) -> str:
+        return self._get_contents(month, [article_id]).get(article_id, '')
+
+    def iter_articles(
+        self,
+        batch_size: int = 1000,
+        relevance_level: Optional[str] = None,
+        source: Optional[str] = None,
+        since: Optional[str] = None,
+        section: Optional[str] = None
+    ) -> Iterator[ArticleRecord]:
+        """Keyset-paginated stream across all matching shards."""
+        months = self.shard_months(since)
+        after = None
+        while True:
+            rows = self._query_shards(
+                months,
+                lambda alias: self.catalog._build_articles_query(
+                    batch_size, relevance_level, source, since,
+                    after=after, table=f'{alias}.articles', section=section
+                ),
+                ARTICLE_ORDER, batch_size, key=_article_key, reverse=True
+            )
+
+            for row in rows:
+                yield ArticleRecord(row, content_loader=partial(self._get_content, row['shard']))
+
+            if len(rows) < batch_size:
+                return
+            last = rows[-1]
+            after = (last['filter_score'], last['collected_at'], last['id'])
+
+    def _collect_ids(self, build: Callable[[str], Tuple[str, List[Any]]]) -> List[str]:
+        ids: List[str] = []
+        months = self.shard_months()
+        for start in range(0, len(months), self.MAX_ATTACHED):
+            with self._attached(months[start:start + self.MAX_ATTACHED]) as (conn, aliases):
+                for alias, _ in aliases:
+                    query, params = build(alias)
+                    ids.extend(row[0] for row in conn.execute(query, params))
+        return ids
+
+    def get_article_ids_by_keywords(self, keywords: List[str]) -> List[str]:
+        if not keywords:
+            return []
+        placeholders = ','.join('?' * len(keywords))
+        return self._collect_ids(lambda alias: (
+            f'SELECT DISTINCT article_id FROM {alias}.article_keywords WHERE keyword IN ({placeholders})',
+            [keyword.lower() for keyword in keywords]
+        ))
+
+    def match_article_ids(self, match: str) -> List[str]:
+        return self._collect_ids(lambda alias: (f'''
+            SELECT a.id FROM {alias}.articles_fts
+            JOIN {alias}.articles a ON a.rowid = articles_fts.rowid
+            WHERE articles_fts MATCH ?
+        ''', [match]))
+
+    def load_articles(self, article_ids: List[str]) -> List[Dict[str, Any]]:
+        wanted = set(article_ids)
+        articles: List[Dict[str, Any]] = []
+        for month in self.shard_months():
+            with self._attached([month]) as (conn, _):
+                found = self.catalog._load_articles(conn, list(wanted), schema='s0')
+            articles.extend(found)
+            wanted.difference_update(article['id'] for article in found)
+            if not wanted:
+                break
+        return articles
+
+    def get_setting(self, key: str) -> Optional[str]:
+        return self.catalog.get_setting(key)
+
+    def set_setting(self, key: str, value: str) -> None:
+        self.catalog.set_setting(key, value)
+
+    def get_articles_by_keyword(self, keyword: str, limit: int = 100) -> List[Dict[str, Any]]:
+        def build(alias: str) -> Tuple[str, List[Any]]:
+            return f'''
+                SELECT a.* FROM {alias}.article_keywords k
+                JOIN {alias}.articles a ON a.id = k.article_id
+                WHERE k.keyword = ?
+                ORDER BY a.filter_score DESC, a.collected_at DESC, a.id DESC
+                LIMIT ?
+            ''', [keyword.lower(), limit]
+
+        rows = self._query_shards(
+            self.shard_months(), build, ARTICLE_ORDER, limit, key=_article_key, reverse=True
+        )
+        return [self._row_to_article(row) for row in rows]
+
+    def get_top_keywords(self, limit: int = 10, since: Optional[str] = None) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        months = self.shard_months(since)
+        for start in range(0, len(months), self.MAX_ATTACHED):
+            with self._attached(months[start:start + self.MAX_ATTACHED]) as (conn, aliases):
+                for alias, _ in aliases:
+                    if since:
+                        rows = conn.execute(f'''
+                            SELECT k.keyword, COUNT(*)
+                            FROM {alias}.articles a
+                            JOIN {alias}.article_keywords k ON k.article_id = a.id
+                            WHERE a.collected_at >= ?
+                            GROUP BY k.keyword
+                        ''', (since,))
+                    else:
+                        rows = conn.execute(f'''
+                            SELECT keyword, COUNT(*) FROM {alias}.article_keywords
+                            GROUP BY keyword
+                        ''')
+                    for keyword, count in rows:
+                        counts[keyword] = counts.get(keyword, 0) + count
+
+        top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return dict(top)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        raw: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Full-text search across every shard, merged by bm25 rank."""
+        match = query if raw else self.catalog._fts_query(query)
+        if not match:
+            return []
+
+        def build(alias: str) -> Tuple[str, List[Any]]:
+            return f'''
+                SELECT
+                    a.id, a.title, a.url, a.source, a.published_at,
+                    a.collected_at, a.filter_score, a.relevance_level,
+                    bm25(articles_fts, 10.0, 5.0, 1.0) AS rank,
+                    snippet(articles_fts, -1, '**', '**', '...', 16) AS snippet
+                FROM {alias}.articles_fts
+                JOIN {alias}.articles a ON a.rowid = articles_fts.rowid
+                WHERE articles_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            ''', [match, limit]
+
+        try:
+            rows = self._query_shards(
+                self.shard_months(), build, 'rank', limit, key=lambda row: row['rank']
+            )
+        except sqlite3.OperationalError as e:
+            logger.error(f"Invalid search query {query!r}: {e}")
+            return []
+
+        return [dict(row) for row in rows]
+
+    def mark_as_sent(self, article_ids: List[str]) -> None:
+        if not article_ids:
+            return
+        placeholders = ','.join('?' * len(article_ids))
+        months = self.shard_months()
+        for start in range(0, len(months), self.MAX_ATTACHED):
+            with self._attached(months[start:start + self.MAX_ATTACHED], read_only=False) as (conn, aliases):
+                for alias, _ in aliases:
+                    conn.execute(
+                        f'UPDATE {alias}.articles SET is_sent = 1 WHERE id IN ({placeholders})',
+                        article_ids
+                    )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Sum the per-shard trigger-maintained counters."""
+        counts: Dict[str, Dict[Optional[str], int]] = {'total': {}, 'source': {}, 'relevance': {}}
+        last_collection = None
+
+        months = self.shard_months()
+        for start in range(0, len(months), self.MAX_ATTACHED):
+            with self._attached(months[start:start + self.MAX_ATTACHED]) as (conn, aliases):
+                union = ' UNION ALL '.join(
+                    f'SELECT dimension, value, count FROM {alias}.article_counts'
+                    for alias, _ in aliases
+                )
+                for dimension, value, count in conn.execute(f'''
+                    SELECT dimension, value, SUM(count) FROM ({union})
+                    GROUP BY dimension, value
+                    HAVING SUM(count) > 0
+                '''):
+                    bucket = counts.setdefault(dimension, {})
+                    bucket[value or None] = bucket.get(value or None, 0) + count
+
+                # Shards are in month order, so the newest non-empty one wins.
+                for alias, _ in reversed(aliases):
+                    row = conn.execute(
+                        f'SELECT collected_at FROM {alias}.articles ORDER BY collected_at DESC LIMIT 1'
+                    ).fetchone()
+                    if row:
+                        last_collection = max(last_collection or '', row[0]) or None
+                        break
+
+        by_source = dict(sorted(counts['source'].items(), key=lambda item: item[1], reverse=True))
+        by_relevance = dict(sorted(counts['relevance'].items(), key=lambda item: item[1], reverse=True))
+
+        return {
+            'total_articles': counts['total'].get(None, 0),
+            'relevant_articles': by_relevance.get('high', 0) + by_relevance.get('medium', 0),
+            'by_source': by_source,
+            'by_relevance': by_relevance,
+            'last_collection': last_collection
+        }
+
+    def cleanup_old_articles(
+        self,
+        days: int = 30,
+        archive_dir: Optional[str] = 'data/archive',
+        batch_size: int = 500
+    ) -> int:
+        """Run retention on shards that can hold expired articles.
+
+        Shards left empty afterwards are deleted outright.
+        """
+        cutoff_month = _month_of((datetime.now() - timedelta(days=days)).isoformat())
+        deleted = 0
+        for month in self.shard_months():
+            if month > cutoff_month:
+                break
+            db = self.shard(month)
+            deleted += db.cleanup_old_articles(days=days, archive_dir=archive_dir, batch_size=batch_size)
+            empty = month < cutoff_month and db.get_stats()['total_articles'] == 0
+            if empty or self.is_frozen(month):
+                with self._lock:
+                    self._shards.pop(month, None)
+                db.close()
+            if empty:
+                for suffix in ('', '-wal', '-shm'):
+                    if os.path.exists(self._shard_path(month) + suffix):
+                        os.remove(self._shard_path(month) + suffix)
+                logger.info(f"Removed empty shard {month}")
+        return deleted
+
+    def log_collection_run(self, *args, **kwargs) -> int:
+        return self.catalog.log_collection_run(*args, **kwargs)
+
+    def get_source_history(self, source: Optional[str] = None, runs: int = 30) -> List[Dict[str, Any]]:
+        return self.catalog.get_source_history(source=source, runs=runs)
+
+    def get_collection_count(self) -> int:
+        return self.catalog.get_collection_count()
+
+    def close(self) -> None:
+        with self._lock:
+            shards = list(self._shards.values())
+            self._shards.clear()
+        for db in shards:
+            db.close()
+        self.catalog.close()
+        self.freeze_old_shards()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_database(config: Optional[Dict[str, Any]] = None):
+    """Build the article store described by the ``database`` config section.
+
+    ``sharding: monthly`` selects ShardedArticleDatabase; anything else
+    uses a single ArticleDatabase file at ``path``.
+    """
+    config = config or {}
+    if config.get('sharding') == 'monthly':
+        return ShardedArticleDatabase(shard_dir=config.get('shard_dir', 'data/shards'))
+    return ArticleDatabase(config.get('path', 'data/newsletter.db'))
+
+
+def store_path(database) -> str:
+    """SQLite file holding store-wide tables; the catalog of a sharded store."""
+    if isinstance(database, ShardedArticleDatabase):
+        return database.catalog.db_path
+    return database.db_path
+
+
+def main():
+    with ShardedArticleDatabase() as db:
+        print(f"Shards: {', '.join(db.shard_months()) or 'none'}")
+        print(f"\nDatabase stats: {json.dumps(db.get_stats(), indent=2)}")
+
+
+if __name__ == '__main__':
+    main()
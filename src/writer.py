@@ -0,0 +1,117 @@
+import queue
+import logging
+import threading
+from typing import List, Dict, Any, Tuple
+
+from .database import ArticleDatabase, BulkInsertResult
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class DatabaseWriter:
+    """Insert articles from a dedicated background thread.
+
+    ``submit`` hands a batch of articles to a bounded queue and returns
+    immediately, so fetching and filtering can continue while earlier
+    batches are written. The writer thread is the only one that touches the
+    database (and so owns its thread-local connection); it drains whatever
+    batches are waiting and commits them together, up to ``group_size``
+    articles per transaction. When ``max_pending`` batches are queued,
+    ``submit`` blocks until the writer catches up.
+
+    ``flush`` waits for everything submitted so far to be committed;
+    ``close`` flushes and stops the thread.
+    """
+
+    def __init__(
+        self,
+        database: ArticleDatabase,
+        max_pending: int = 16,
+        group_size: int = 500
+    ):
+        self.database = database
+        self.group_size = max(1, group_size)
+        self.result = BulkInsertResult()
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+        self._result_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, articles: List[Dict[str, Any]]) -> None:
+        """Queue articles for insertion, blocking while the queue is full."""
+        if self._closed:
+            raise RuntimeError('DatabaseWriter is closed')
+        if articles:
+            self._queue.put(list(articles))
+
+    def _next_group(self) -> Tuple[List[List[Dict[str, Any]]], bool]:
+        """Block for one batch, then take any others already waiting.
+
+        Returns the batches and whether the stop sentinel was reached.
+        """
+        group: List[List[Dict[str, Any]]] = []
+        size = 0
+        batch = self._queue.get()
+        while True:
+            if batch is _STOP:
+                self._queue.task_done()
+                return group, True
+            group.append(batch)
+            size += len(batch)
+            if size >= self.group_size:
+                return group, False
+            try:
+                batch = self._queue.get_nowait()
+            except queue.Empty:
+                return group, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            group, stop = self._next_group()
+            if not group:
+                continue
+
+            articles = [article for batch in group for article in batch]
+            try:
+                result = self.database.bulk_insert_articles(articles, batch_size=self.group_size)
+            except Exception as e:
+                logger.error(f"Background insert of {len(articles)} articles failed: {e}")
+                result = BulkInsertResult(errors=[(article.get('id'), str(e)) for article in articles])
+
+            with self._result_lock:
+                self.result.inserted += result.inserted
+                self.result.unchanged += result.unchanged
+                self.result.errors.extend(result.errors)
+
+            for _ in group:
+                self._queue.task_done()
+
+    def flush(self) -> BulkInsertResult:
+        """Wait until every submitted batch is committed."""
+        self._queue.join()
+        with self._result_lock:
+            return BulkInsertResult(
+                inserted=self.result.inserted,
+                unchanged=self.result.unchanged,
+                errors=list(self.result.errors)
+            )
+
+    def close(self) -> BulkInsertResult:
+        if self._closed:
+            return self.flush()
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()